@@ -0,0 +1,401 @@
+"""
+Generation and grading logic shared by the Streamlit app and the HTTP service.
+
+The Gemini SDK and pypdf are imported on first use, and the model client is
+built lazily by a swappable provider, so importing this module is cheap and
+needs no credentials. A provider returns the client together with the config
+passed on each call, so the FakeClient path imports nothing from google.
+Set AGENT_MODEL_CLIENT=fake (optionally with AGENT_FAKE_LATENCY=<seconds>) to
+run against the FakeClient.
+"""
+import os
+import re
+import threading
+
+_client = None
+_client_provider = None
+_client_lock = threading.Lock()
+_text_config = None     # built by the provider together with _client
+
+
+def default_client_provider():
+    """Return (client, text config): the FakeClient with no config, or genai.Client() with a TEXT config."""
+    if os.environ.get("AGENT_MODEL_CLIENT") == "fake":
+        from fake_client import FakeClient
+        return FakeClient(latency=float(os.environ.get("AGENT_FAKE_LATENCY", "0"))), None
+    from google import genai
+    from google.genai import types
+    return genai.Client(), types.GenerateContentConfig(response_modalities=["TEXT"])
+
+
+def set_client_provider(provider):
+    """On next use, build (client, text config) with provider() instead of default_client_provider()."""
+    global _client, _text_config, _client_provider
+    with _client_lock:
+        _client_provider = provider
+        _client = _text_config = None
+
+
+def use_client(new_client, config=None):
+    """Replace the shared model client (e.g. with a local stand-in) and the config sent with each call."""
+    set_client_provider(lambda: (new_client, config))
+
+
+def _ensure_client():
+    global _client, _text_config
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client, config = (_client_provider or default_client_provider)()
+                _text_config, _client = config, client
+    return _client, _text_config
+
+
+def get_client():
+    return _ensure_client()[0]
+
+
+def text_config():
+    """Config for text generation, as supplied by the client provider."""
+    return _ensure_client()[1]
+
+
+def read_pdf_pages(file_path, on_error=print):
+    from pypdf import PdfReader
+    try:
+        reader = PdfReader(file_path)
+        return [page.extract_text() for page in reader.pages]
+    except Exception as e:
+        on_error(f"Error reading PDF: {e}")
+        return None
+
+
+def read_pdf(file_path, on_error=print):
+    pages = read_pdf_pages(file_path, on_error)
+    return "".join(pages) if pages is not None else None
+
+
+def generate_mcq_questions(pdf_text, n):
+    model = "gemini-2.5-flash-lite"
+    prompt = f"""
+    Based on the following course slides text, generate {n} multiple-choice questions (MCQs)
+    with four options and the correct answer
+    Assign reasonable marks (2–3).
+
+     ---
+    Course Slides Text:
+    {pdf_text}
+    ---
+
+    Format strictly as:
+
+    1. Question text? [Marks: 2]
+       A) Option A
+       B) Option B
+       C) Option C
+       D) Option D
+       Correct Answer: B
+    """
+    response = get_client().models.generate_content(
+        model=model,
+        contents=prompt,
+        config=text_config()
+    )
+    return response.text
+
+
+def generate_long_answer_questions(pdf_text, n):
+    model = "gemini-2.5-flash-lite"
+    prompt = f"""
+    Based on the following course slides text, Generate {n} long-answer descriptive questions requiring explanations.
+    Assign reasonable marks (5–10). No answers.
+     ---
+    Course Slides Text:
+    {pdf_text}
+    ---
+
+    Format strictly as:
+
+    1. Question text? [Marks: 8]
+    """
+    response = get_client().models.generate_content(
+        model=model,
+        contents=prompt,
+        config=text_config()
+    )
+    return response.text
+
+
+def generate_programming_questions(pdf_text, n):
+    model = "gemini-2.5-flash-lite"
+    prompt = f"""
+    Based on the following course slides text, Generate {n} programming assignment questions
+    Assign reasonable marks (5–15). No answers.
+     ---
+    Course Slides Text:
+    {pdf_text}
+    ---
+
+    Format strictly as:
+
+    1. Write a program to ... [Marks: 10]
+    """
+    response = get_client().models.generate_content(
+        model=model,
+        contents=prompt,
+        config=text_config()
+    )
+    return response.text
+
+
+def extract_marks_from_question(question_text):
+    match = re.search(r'\[Marks:\s*(\d+)\]', question_text)
+    return int(match.group(1)) if match else 0
+
+
+def check_mcq_answer(questions_text, question_number, user_answer):
+    pattern = rf"{question_number}\..*?Correct Answer: ([A-D])"
+    match = re.search(pattern, questions_text, re.DOTALL)
+    if match:
+        return user_answer.upper() == match.group(1)
+    return False
+
+
+def get_correct_mcq_answer(questions_text, question_number):
+    pattern = rf"{question_number}\..*?Correct Answer: ([A-D])"
+    match = re.search(pattern, questions_text, re.DOTALL)
+    return match.group(1) if match else None
+
+
+def extract_suggested_marks(ai_response, max_marks):
+    patterns = [
+        r'[Ss]uggested marks?:?\s*(\d+)(?:/\d+)?',
+        r'[Mm]ards?:?\s*(\d+)(?:\s*out of\s*\d+)?',
+        r'[Ss]core:?\s*(\d+)(?:/\d+)?',
+        r'[Gg]rade:?\s*(\d+)(?:/\d+)?',
+        r'(\d+)\s*marks?\s*out of',
+        r'(\d+)\s*/\s*\d+\s*marks?',
+        r'award\s*(\d+)\s*marks?',
+        r'give\s*(\d+)\s*marks?'
+    ]
+
+    for pattern in patterns:
+        match = re.search(pattern, ai_response, re.IGNORECASE)
+        if match:
+            suggested = int(match.group(1))
+            return min(suggested, max_marks)  # Don't exceed max marks
+
+    return 0  # Default to 0 if no marks found
+
+
+def evaluate_long_answer(question, student_answer):
+    model = "gemini-2.5-flash-lite"
+    max_marks = extract_marks_from_question(question)
+    prompt = f"""
+    You are grading a student's descriptive answer. Evaluate correctness and completeness.
+    The question is worth {max_marks} marks total.
+
+    Question:
+    {question}
+
+    Answer:
+    {student_answer}
+
+    Please provide:
+    1. Brief feedback on the answer quality
+    2. Suggested marks: X/{max_marks} (be specific with the number)
+    3. Areas for improvement (if any)
+
+    Format your response clearly and include "Suggested marks: X/{max_marks}" in your feedback.
+    """
+    response = get_client().models.generate_content(
+        model=model,
+        contents=prompt,
+        config=text_config()
+    )
+    return response.text
+
+
+def analyze_programming(question, student_code):
+    model = "gemini-2.5-flash-lite"
+    max_marks = extract_marks_from_question(question)
+    prompt = f"""
+    Analyze the following student code logically (do not run).
+    The question is worth {max_marks} marks total.
+
+    Question:
+    {question}
+
+    Code:
+    {student_code}
+
+    Please provide:
+    1. Code logic analysis
+    2. Suggested marks: X/{max_marks} (be specific with the number)
+    3. Areas for improvement
+
+    Format your response clearly and include "Suggested marks: X/{max_marks}" in your feedback.
+    """
+    response = get_client().models.generate_content(
+        model=model,
+        contents=prompt,
+        config=text_config()
+    )
+    return response.text
+
+
+SECTION_KINDS = {
+    "mcqs": ("multiple-choice question (MCQ) with four options and the correct answer",
+             "1. Question text? [Marks: {marks}]\n"
+             "       A) Option A\n       B) Option B\n       C) Option C\n       D) Option D\n"
+             "       Correct Answer: B"),
+    "longs": ("long-answer descriptive question requiring explanation. No answer",
+              "1. Question text? [Marks: {marks}]"),
+    "progs": ("programming assignment question. No answer",
+              "1. Write a program to ... [Marks: {marks}]")
+}
+
+
+def regenerate_question(pdf_text, section, question, other_questions):
+    """
+    Asks for a single replacement question in the format of the given section.
+    Args:
+        pdf_text (str): Slide text the assignment was generated from.
+        section (str): "mcqs", "longs" or "progs".
+        question (str): The question being replaced; its marks are kept.
+        other_questions (list): The rest of the section, which the new question must not repeat.
+    Returns:
+        str: The model's response, formatted as a single numbered question.
+    """
+    model = "gemini-2.5-flash-lite"
+    kind, example = SECTION_KINDS[section]
+    marks = extract_marks_from_question(question)
+    others = "\n".join(other_questions)
+    prompt = f"""
+    Based on the following course slides text, Generate 1 {kind}
+    to replace the question below. It must differ from the existing questions
+    and be worth exactly {marks} marks.
+     ---
+    Course Slides Text:
+    {pdf_text}
+    ---
+
+    Question to replace:
+    {question}
+
+    Existing questions (do not repeat):
+    {others}
+
+    Format strictly as:
+
+    {example.format(marks=marks)}
+    """
+    response = get_client().models.generate_content(
+        model=model,
+        contents=prompt,
+        config=text_config()
+    )
+    return response.text
+
+
+def split_section_items(section_text):
+    """Split a generated section into question blocks, each starting at its "N." line."""
+    items = []
+    for line in section_text.split("\n"):
+        if re.match(r'^\s*\d+\.(\s|$)', line):
+            items.append([line.strip()])
+        elif items and line.strip():
+            items[-1].append(line.rstrip())
+    return ["\n".join(item) for item in items]
+
+
+def join_section_items(items):
+    """Join question blocks back into a section, renumbering them 1..n."""
+    numbered = [re.sub(r'^\s*\d+\.', f"{i}.", item, count=1) for i, item in enumerate(items, start=1)]
+    return "\n\n".join(numbered)
+
+
+def replace_question(section_text, question_number, new_question):
+    """
+    Swap question N of a section for the first question block in new_question.
+    The replacement keeps the original's [Marks: N]; replacing an MCQ requires
+    a "Correct Answer: X" line, since grading reads the key from it.
+    Raises:
+        ValueError: If new_question has no numbered question, or an MCQ has no answer line.
+    """
+    items = split_section_items(section_text)
+    replacement = split_section_items(new_question)
+    if not replacement:
+        raise ValueError("the model did not return a numbered question")
+    original, question = items[question_number - 1], replacement[0]
+
+    if re.search(r'\[Marks:\s*\d+\]', original):
+        marks = f"[Marks: {extract_marks_from_question(original)}]"
+        if re.search(r'\[Marks:\s*\d+\]', question):
+            question = re.sub(r'\[Marks:\s*\d+\]', marks, question, count=1)
+        else:
+            first_line, _, rest = question.partition("\n")
+            question = f"{first_line} {marks}" + (f"\n{rest}" if rest else "")
+    if "Correct Answer" in original and not re.search(r'^\s*Correct Answer: [A-D]\s*$', question, re.MULTILINE):
+        raise ValueError('the model did not return a "Correct Answer: A-D" line')
+
+    items[question_number - 1] = question
+    return join_section_items(items)
+
+
+def split_numbered_questions(section_text):
+    """Return the lines of a generated section that start with "N."."""
+    return [q.strip() for q in section_text.split("\n") if
+            q.strip() and re.match(r'^\d+\.', q.strip())]
+
+
+def grade_submission(assignment, mcq_answers, long_answers, prog_answers):
+    """
+    Grades one student's submission against a generated assignment.
+    Args:
+        assignment (dict): {"mcqs": str, "longs": str, "progs": str} as generated.
+        mcq_answers (dict): question number -> selected option ("A".."D").
+        long_answers (dict): question number -> descriptive answer text.
+        prog_answers (dict): question number -> submitted code.
+    Returns:
+        dict: Evaluation results keyed "mcq{i}", "long{i}" and "prog{i}",
+              only for attempted questions.
+    """
+    evaluation_results = {}
+
+    mcq_blocks = assignment["mcqs"].split("Correct Answer")
+    for i in range(1, len(mcq_blocks)):
+        user_answer = mcq_answers.get(i)
+        if user_answer:
+            evaluation_results[f"mcq{i}"] = {
+                "attempted": True,
+                "user_answer": user_answer,
+                "correct_answer": get_correct_mcq_answer(assignment["mcqs"], i),
+                "correct": check_mcq_answer(assignment["mcqs"], i, user_answer)
+            }
+
+    for i, q in enumerate(split_numbered_questions(assignment["longs"]), start=1):
+        user_answer = long_answers.get(i)
+        if user_answer and user_answer.strip():
+            feedback = evaluate_long_answer(q, user_answer)
+            evaluation_results[f"long{i}"] = {
+                "attempted": True,
+                "question": q,
+                "user_answer": user_answer,
+                "feedback": feedback,
+                "suggested_marks": extract_suggested_marks(feedback, extract_marks_from_question(q))
+            }
+
+    for i, q in enumerate(split_numbered_questions(assignment["progs"]), start=1):
+        user_code = prog_answers.get(i)
+        if user_code and user_code.strip():
+            feedback = analyze_programming(q, user_code)
+            evaluation_results[f"prog{i}"] = {
+                "attempted": True,
+                "question": q,
+                "user_code": user_code,
+                "feedback": feedback,
+                "suggested_marks": extract_suggested_marks(feedback, extract_marks_from_question(q))
+            }
+
+    return evaluation_results
@@ -1,192 +1,22 @@
 import streamlit as st
 import os
+import io
 import re
-from pypdf import PdfReader
-from google import genai
-from google.genai import types
-
-client = genai.Client()
-
-
-def read_pdf(file_path):
-    try:
-        reader = PdfReader(file_path)
-        text_content = ""
-        for page in reader.pages:
-            text_content += page.extract_text()
-        return text_content
-    except Exception as e:
-        st.error(f"Error reading PDF: {e}")
-        return None
-
-
-def generate_mcq_questions(pdf_text, n):
-    model = "gemini-2.5-flash-lite"
-    prompt = f"""
-    Based on the following course slides text, generate {n} multiple-choice questions (MCQs)
-    with four options and the correct answer
-    Assign reasonable marks (2–3). 
-
-     ---
-    Course Slides Text:
-    {pdf_text}
-    ---
-
-    Format strictly as:
-
-    1. Question text? [Marks: 2]
-       A) Option A
-       B) Option B
-       C) Option C
-       D) Option D
-       Correct Answer: B
-    """
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-        config=types.GenerateContentConfig(response_modalities=["TEXT"])
-    )
-    return response.text
-
-
-def generate_long_answer_questions(pdf_text, n):
-    model = "gemini-2.5-flash-lite"
-    prompt = f"""
-    Based on the following course slides text, Generate {n} long-answer descriptive questions requiring explanations.
-    Assign reasonable marks (5–10). No answers.    
-     ---
-    Course Slides Text:
-    {pdf_text}
-    ---
-
-    Format strictly as:
-
-    1. Question text? [Marks: 8]
-    """
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-        config=types.GenerateContentConfig(response_modalities=["TEXT"])
-    )
-    return response.text
-
-
-def generate_programming_questions(pdf_text, n):
-    model = "gemini-2.5-flash-lite"
-    prompt = f"""
-    Based on the following course slides text, Generate {n} programming assignment questions
-    Assign reasonable marks (5–15). No answers.    
-     ---
-    Course Slides Text:
-    {pdf_text}
-    ---
-
-    Format strictly as:
-
-    1. Write a program to ... [Marks: 10]
-    """
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-        config=types.GenerateContentConfig(response_modalities=["TEXT"])
-    )
-    return response.text
-
-
-def extract_marks_from_question(question_text):
-    match = re.search(r'\[Marks:\s*(\d+)\]', question_text)
-    return int(match.group(1)) if match else 0
-
-
-def check_mcq_answer(questions_text, question_number, user_answer):
-    pattern = rf"{question_number}\..*?Correct Answer: ([A-D])"
-    match = re.search(pattern, questions_text, re.DOTALL)
-    if match:
-        return user_answer.upper() == match.group(1)
-    return False
-
-
-def get_correct_mcq_answer(questions_text, question_number):
-    pattern = rf"{question_number}\..*?Correct Answer: ([A-D])"
-    match = re.search(pattern, questions_text, re.DOTALL)
-    return match.group(1) if match else None
-
-
-def extract_suggested_marks(ai_response, max_marks):
-    patterns = [
-        r'[Ss]uggested marks?:?\s*(\d+)(?:/\d+)?',
-        r'[Mm]ards?:?\s*(\d+)(?:\s*out of\s*\d+)?',
-        r'[Ss]core:?\s*(\d+)(?:/\d+)?',
-        r'[Gg]rade:?\s*(\d+)(?:/\d+)?',
-        r'(\d+)\s*marks?\s*out of',
-        r'(\d+)\s*/\s*\d+\s*marks?',
-        r'award\s*(\d+)\s*marks?',
-        r'give\s*(\d+)\s*marks?'
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, ai_response, re.IGNORECASE)
-        if match:
-            suggested = int(match.group(1))
-            return min(suggested, max_marks)  # Don't exceed max marks
-
-    return 0  # Default to 0 if no marks found
-
-
-def evaluate_long_answer(question, student_answer):
-    model = "gemini-2.5-flash-lite"
-    max_marks = extract_marks_from_question(question)
-    prompt = f"""
-    You are grading a student's descriptive answer. Evaluate correctness and completeness.
-    The question is worth {max_marks} marks total.
-
-    Question:
-    {question}
-
-    Answer:
-    {student_answer}
-
-    Please provide:
-    1. Brief feedback on the answer quality
-    2. Suggested marks: X/{max_marks} (be specific with the number)
-    3. Areas for improvement (if any)
-
-    Format your response clearly and include "Suggested marks: X/{max_marks}" in your feedback.
-    """
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-        config=types.GenerateContentConfig(response_modalities=["TEXT"])
-    )
-    return response.text
-
-
-def analyze_programming(question, student_code):
-    model = "gemini-2.5-flash-lite"
-    max_marks = extract_marks_from_question(question)
-    prompt = f"""
-    Analyze the following student code logically (do not run).
-    The question is worth {max_marks} marks total.
-
-    Question:
-    {question}
-
-    Code:
-    {student_code}
-
-    Please provide:
-    1. Code logic analysis
-    2. Suggested marks: X/{max_marks} (be specific with the number)
-    3. Areas for improvement
-
-    Format your response clearly and include "Suggested marks: X/{max_marks}" in your feedback.
-    """
-    response = client.models.generate_content(
-        model=model,
-        contents=prompt,
-        config=types.GenerateContentConfig(response_modalities=["TEXT"])
-    )
-    return response.text
+import hashlib
+import tempfile
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from session_store import SessionStateManager
+from compaction import compact_slides
+from corpus import CourseCorpus
+from profiler import RerunProfiler
+from export import (
+    default_course_info, write_grades_csv, write_grades_jsonl, render_assignment_tex, render_grade_report_tex
+)
+from agent import (
+    read_pdf_pages, generate_mcq_questions, generate_long_answer_questions, generate_programming_questions,
+    extract_marks_from_question, split_numbered_questions, grade_submission,
+    regenerate_question, split_section_items, replace_question
+)
 
 
 def calculate_statistics():
@@ -195,7 +25,7 @@ def calculate_statistics():
         return None
 
     results = st.session_state["evaluation_results"]
-    assignment = st.session_state["assignment"]
+    assignment = session_store.resolve(st.session_state["assignment"])
 
     stats = {
         "mcq": {"attempted": 0, "correct": 0, "total": 0, "marks_obtained": 0, "total_marks": 0},
@@ -245,17 +75,135 @@ def calculate_statistics():
     return stats
 
 
+def render_profiler_sidebar(profiler):
+    """Debug sidebar with the section breakdown of recent reruns (APP_PROFILE=1 only)"""
+    with st.sidebar.expander("Rerun Profiler", expanded=True):
+        last = profiler.history[-1]
+        averages = profiler.averages()
+        st.write(f"Last rerun: {last['total'] * 1000:.1f} ms "
+                 f"(avg {averages['total'] * 1000:.1f} ms over {len(profiler.history)} reruns)")
+        st.dataframe([{"Section": name,
+                       "Last (ms)": round(last["sections"].get(name, 0.0) * 1000, 2),
+                       "Avg (ms)": round(average * 1000, 2)}
+                      for name, average in averages.items() if name != "total"], hide_index=True)
+
+        capture_mode = st.radio("Profiler", ["cprofile", "sampling"], horizontal=True, key="profiler_mode")
+        if st.button("Profile Next Interaction"):
+            profiler.capture_next = capture_mode
+        if profiler.last_capture:
+            st.text(profiler.last_capture["summary"])
+        if st.button("Write Profile to File"):
+            st.write(profiler.write())
+
+
+if "profiler" not in st.session_state:
+    st.session_state["profiler"] = RerunProfiler(enabled=os.environ.get("APP_PROFILE") == "1")
+profiler = st.session_state["profiler"]
+profiler.start_rerun()
+
 st.set_page_config(page_title="AI Agent for University Assignment", layout="wide")
 st.title("AI-Agent for University Assignment")
 
+
+@st.cache_resource
+def get_session_store():
+    """One store shared by every session of this server process."""
+    return SessionStateManager(
+        memory_cap_bytes=int(os.environ.get("SESSION_MEMORY_CAP_MB", "64")) * 1024 * 1024,
+        idle_seconds=float(os.environ.get("SESSION_IDLE_SECONDS", "600")),
+        expire_seconds=float(os.environ.get("SESSION_EXPIRE_SECONDS", str(6 * 3600)))
+    )
+
+
+COURSE_ROOT = os.path.realpath(os.environ.get("COURSE_ROOT", "courses"))
+COURSE_CACHE_DIR = os.environ.get("COURSE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "course_corpus"))
+
+
+def resolve_course_dir(course_dir):
+    """Absolute path of a course folder, or None if it lies outside COURSE_ROOT."""
+    path = os.path.realpath(os.path.join(COURSE_ROOT, course_dir))
+    return path if os.path.commonpath([path, COURSE_ROOT]) == COURSE_ROOT else None
+
+
+@st.cache_resource
+def get_course_corpus(course_dir):
+    # Extracted text is cached on the server, never written into the course folder
+    store_dir = os.path.join(COURSE_CACHE_DIR, hashlib.sha256(course_dir.encode("utf-8")).hexdigest()[:16])
+    return CourseCorpus(course_dir, store_dir)
+
+
+def deferred_grade_export(build, assignment, student_id, results, overrides):
+    """
+    Download-button data callable for one student's grades: the stored results are resolved
+    and the file built only when the button is clicked, never on an ordinary rerun.
+    """
+    def export():
+        resolved = {key: session_store.resolve(result) for key, result in results.items()}
+        record = {"student_id": student_id, "evaluation_results": resolved, "overrides": overrides}
+        return build(assignment, record)
+    return export
+
+
+def grades_file(write):
+    def build(assignment, record):
+        f = io.StringIO()
+        write(assignment, [record], f)
+        return f.getvalue()
+    return build
+
+
+session_store = get_session_store()
+run_ctx = get_script_run_ctx()
+session_id = run_ctx.session_id if run_ctx else "local"
+if not session_store.is_live(session_id):
+    # The store expired this session while it was idle; its handles no longer resolve
+    for key in ("assignment", "slides_text", "evaluation_results"):
+        st.session_state.pop(key, None)
+session_store.touch(session_id)
+session_store.evict_idle()
+# Filled at the end of the script, once this rerun's generate/evaluate has stored its blobs
+footprint_slot = st.sidebar.empty()
+
 if "evaluation_results" not in st.session_state:
     st.session_state["evaluation_results"] = {}
 
 generator_tab, attempt_tab, evaluator_tab = st.tabs(["Assignment Generator", "Attempt", "Evaluation"])
 
-with generator_tab:
+with generator_tab, profiler.section("Generator tab"):
     st.header("Generate Assignment")
-    uploaded_file = st.file_uploader("Upload Course Slides (PDF)", type=["pdf"])
+    slides_source = st.radio("Slides Source", ["Upload PDF", "Course Folder"], horizontal=True)
+    uploaded_file = None
+    course_corpus = None
+    lecture_selection = ""
+
+    if slides_source == "Upload PDF":
+        uploaded_file = st.file_uploader("Upload Course Slides (PDF)", type=["pdf"])
+    else:
+        course_dir = st.text_input("Course folder containing one PDF per lecture")
+        course_path = resolve_course_dir(course_dir) if course_dir else None
+        if course_dir and course_path is None:
+            st.warning(f"Course folders must be inside {COURSE_ROOT}.")
+        elif course_path and os.path.isdir(course_path):
+            try:
+                course_corpus = get_course_corpus(course_path)
+                refresh_report = course_corpus.refresh(on_error=st.error)
+            except OSError as e:
+                st.error(f"Could not read the course folder: {e}")
+            else:
+                if refresh_report["added"] or refresh_report["changed"]:
+                    st.caption(f"Extracted {len(refresh_report['added'])} new and "
+                               f"{len(refresh_report['changed'])} changed lecture PDFs")
+                for number, names in sorted(course_corpus.conflicts.items()):
+                    st.warning(f"Lecture {number} is {course_corpus.lectures()[number]}; "
+                               f"ignoring {', '.join(names)}. Rename the files so each has its own number.")
+                st.caption("Lectures: " + ", ".join(f"{number} ({name})" for number, name in
+                                                    course_corpus.lectures().items()))
+                if course_corpus.failures():
+                    st.caption("Skipped until they change (could not be read): "
+                               + ", ".join(course_corpus.failures()))
+                lecture_selection = st.text_input("Lectures to use (e.g. 3-7, 9)")
+        elif course_dir:
+            st.warning("Course folder not found.")
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -265,11 +213,28 @@ with generator_tab:
     with col3:
         prog_count = st.number_input("Number of Programming Questions", 1, 5, 2)
 
-    if uploaded_file and st.button("Generate Assignment", type="primary"):
+    if (uploaded_file or lecture_selection) and st.button("Generate Assignment", type="primary"):
         with st.spinner("Generating assignment..."):
-            with open("temp.pdf", "wb") as f:
-                f.write(uploaded_file.read())
-            slides_text = read_pdf("temp.pdf")
+            if uploaded_file:
+                with open("temp.pdf", "wb") as f:
+                    f.write(uploaded_file.read())
+                slides_pages = read_pdf_pages("temp.pdf", on_error=st.error)
+            else:
+                try:
+                    slides_pages = course_corpus.pages(lecture_selection)
+                except (KeyError, ValueError) as e:
+                    st.error(f"Invalid lecture selection: {e}")
+                    slides_pages = None
+                except OSError as e:
+                    st.error(f"Could not read the lecture text: {e}")
+                    slides_pages = None
+            slides_text = None
+            if slides_pages:
+                slides_text, compaction_report = compact_slides(slides_pages)
+                st.caption(f"Slide text compacted from ~{compaction_report['original_tokens']} to "
+                           f"~{compaction_report['compacted_tokens']} tokens "
+                           f"({compaction_report['saved_ratio']:.0%} saved, "
+                           f"{compaction_report['pages_kept']}/{compaction_report['pages']} pages kept)")
 
             if slides_text:
                 st.subheader("Generated Questions")
@@ -286,18 +251,79 @@ with generator_tab:
                 st.markdown("###  Programming Questions")
                 st.text(progs)
 
-                st.session_state["assignment"] = {"mcqs": mcqs, "longs": longs, "progs": progs}
+                previous = {key: st.session_state.get(key) for key in ("assignment", "slides_text")}
+                st.session_state["assignment"] = session_store.put_fields(
+                    session_id, {"mcqs": mcqs, "longs": longs, "progs": progs}, ("mcqs", "longs", "progs"))
+                st.session_state["slides_text"] = session_store.put(session_id, slides_text)
+                session_store.release_fields(session_id, previous.get("assignment") or {})
+                session_store.release_fields(session_id, {"slides_text": previous["slides_text"]})
                 st.success("Assignment generated successfully! Go to the 'Attempt' tab to start.")
 
-with attempt_tab:
+    if "assignment" in st.session_state and "slides_text" in st.session_state:
+        st.markdown("---")
+        st.subheader("Regenerate Questions")
+        st.caption("Replace one question or a whole section; the rest of the assignment is kept.")
+
+        section_labels = {"mcqs": "Multiple Choice", "longs": "Long Answer", "progs": "Programming"}
+        section_generators = {"mcqs": generate_mcq_questions, "longs": generate_long_answer_questions,
+                              "progs": generate_programming_questions}
+        # Session-state keys tied to a question number in each section
+        section_state_keys = {"mcqs": ("mcq",), "longs": ("long", "override"), "progs": ("prog", "progmarks")}
+
+        assignment = session_store.resolve(st.session_state["assignment"])
+        regen_col1, regen_col2 = st.columns(2)
+        with regen_col1:
+            regen_section = st.selectbox("Section", list(section_labels), format_func=section_labels.get)
+        section_items = split_section_items(assignment[regen_section])
+        with regen_col2:
+            regen_target = st.selectbox("Question", [0] + list(range(1, len(section_items) + 1)),
+                                        format_func=lambda n: f"Question {n}" if n else "Whole section")
+
+        if st.button("Regenerate"):
+            with st.spinner("Regenerating..."):
+                slides_text = session_store.get(st.session_state["slides_text"])
+                try:
+                    if regen_target:
+                        new_question = regenerate_question(
+                            slides_text, regen_section, section_items[regen_target - 1],
+                            section_items[:regen_target - 1] + section_items[regen_target:])
+                        assignment[regen_section] = replace_question(assignment[regen_section], regen_target,
+                                                                     new_question)
+                        replaced = [regen_target]
+                    else:
+                        assignment[regen_section] = section_generators[regen_section](
+                            slides_text, max(len(section_items), 1))
+                        replaced = range(1, len(section_items) + 1)
+                except ValueError as e:
+                    st.error(f"Could not regenerate: {e}")
+                else:
+                    # Answers and grades for replaced questions no longer apply
+                    for i in replaced:
+                        for prefix in section_state_keys[regen_section]:
+                            st.session_state.pop(f"{prefix}{i}", None)
+                        stale = st.session_state["evaluation_results"].pop(
+                            f"{section_state_keys[regen_section][0]}{i}", None)
+                        session_store.release_fields(session_id, stale or {})
+                    previous = st.session_state["assignment"]
+                    st.session_state["assignment"] = session_store.put_fields(
+                        session_id, assignment, ("mcqs", "longs", "progs"))
+                    session_store.release_fields(session_id, previous)
+                    st.success(f"{section_labels[regen_section]} "
+                               f"{'question ' + str(regen_target) if regen_target else 'section'} regenerated.")
+
+        with st.expander(f"Current {section_labels[regen_section]} Questions"):
+            st.text(assignment[regen_section])
+
+with attempt_tab, profiler.section("Attempt tab"):
     if "assignment" not in st.session_state:
         st.info("Please generate an assignment first in the 'Assignment Generator' tab.")
     else:
         st.header("Attempt Assignment")
-        assignment = st.session_state["assignment"]
+        assignment = session_store.resolve(st.session_state["assignment"])
 
         st.subheader("Multiple Choice Questions")
-        mcq_blocks = assignment["mcqs"].split("Correct Answer")
+        with profiler.section("Parse questions"):
+            mcq_blocks = assignment["mcqs"].split("Correct Answer")
         mcq_questions = []
 
         for i, q_block in enumerate(mcq_blocks[:-1], start=1):
@@ -311,8 +337,8 @@ with attempt_tab:
 
         # Long Answer Section
         st.subheader("Long Answer Questions")
-        long_questions = [q.strip() for q in assignment["longs"].split("\n") if
-                          q.strip() and re.match(r'^\d+\.', q.strip())]
+        with profiler.section("Parse questions"):
+            long_questions = split_numbered_questions(assignment["longs"])
 
         for i, q in enumerate(long_questions, start=1):
             st.markdown(f"Question {i}:")
@@ -321,8 +347,8 @@ with attempt_tab:
             st.divider()
 
         st.subheader("Programming Questions")
-        prog_questions = [q.strip() for q in assignment["progs"].split("\n") if
-                          q.strip() and re.match(r'^\d+\.', q.strip())]
+        with profiler.section("Parse questions"):
+            prog_questions = split_numbered_questions(assignment["progs"])
 
         for i, q in enumerate(prog_questions, start=1):
             st.markdown(f"Question {i}:")
@@ -334,56 +360,32 @@ with attempt_tab:
         st.markdown("---")
         if st.button("🔍 Evaluate Assignment", type="primary", use_container_width=True):
             with st.spinner("Evaluating your assignment..."):
-                evaluation_results = {}
-
-                for i in range(1, len(mcq_blocks)):
-                    user_answer = st.session_state.get(f"mcq{i}")
-                    if user_answer:
-                        correct = check_mcq_answer(assignment["mcqs"], i, user_answer)
-                        correct_answer = get_correct_mcq_answer(assignment["mcqs"], i)
-                        evaluation_results[f"mcq{i}"] = {
-                            "attempted": True,
-                            "user_answer": user_answer,
-                            "correct_answer": correct_answer,
-                            "correct": correct
-                        }
-
-                for i, q in enumerate(long_questions, start=1):
-                    user_answer = st.session_state.get(f"long{i}")
-                    if user_answer and user_answer.strip():
-                        feedback = evaluate_long_answer(q, user_answer)
-                        max_marks = extract_marks_from_question(q)
-                        suggested_marks = extract_suggested_marks(feedback, max_marks)
-                        evaluation_results[f"long{i}"] = {
-                            "attempted": True,
-                            "question": q,
-                            "user_answer": user_answer,
-                            "feedback": feedback,
-                            "suggested_marks": suggested_marks
-                        }
-                        if f"override{i}" not in st.session_state:
-                            st.session_state[f"override{i}"] = suggested_marks
-
-                for i, q in enumerate(prog_questions, start=1):
-                    user_code = st.session_state.get(f"prog{i}")
-                    if user_code and user_code.strip():
-                        feedback = analyze_programming(q, user_code)
-                        max_marks = extract_marks_from_question(q)
-                        suggested_marks = extract_suggested_marks(feedback, max_marks)
-                        evaluation_results[f"prog{i}"] = {
-                            "attempted": True,
-                            "question": q,
-                            "user_code": user_code,
-                            "feedback": feedback,
-                            "suggested_marks": suggested_marks
-                        }
-                        if f"progmarks{i}" not in st.session_state:
-                            st.session_state[f"progmarks{i}"] = suggested_marks
-
-                st.session_state["evaluation_results"] = evaluation_results
+                evaluation_results = grade_submission(
+                    assignment,
+                    {i: st.session_state.get(f"mcq{i}") for i in range(1, len(mcq_blocks))},
+                    {i: st.session_state.get(f"long{i}") for i in range(1, len(long_questions) + 1)},
+                    {i: st.session_state.get(f"prog{i}") for i in range(1, len(prog_questions) + 1)}
+                )
+
+                for i in range(1, len(long_questions) + 1):
+                    if f"long{i}" in evaluation_results and f"override{i}" not in st.session_state:
+                        st.session_state[f"override{i}"] = evaluation_results[f"long{i}"]["suggested_marks"]
+
+                for i in range(1, len(prog_questions) + 1):
+                    if f"prog{i}" in evaluation_results and f"progmarks{i}" not in st.session_state:
+                        st.session_state[f"progmarks{i}"] = evaluation_results[f"prog{i}"]["suggested_marks"]
+
+                previous = st.session_state["evaluation_results"]
+                st.session_state["evaluation_results"] = {
+                    key: result if key.startswith("mcq") else
+                    session_store.put_fields(session_id, result, ("user_answer", "user_code", "feedback"))
+                    for key, result in evaluation_results.items()
+                }
+                for result in previous.values():
+                    session_store.release_fields(session_id, result)
                 st.success("Evaluation completed! Check the 'Evaluation' tab for results.")
 
-with evaluator_tab:
+with evaluator_tab, profiler.section("Evaluation tab"):
     if "assignment" not in st.session_state:
         st.info("Please generate an assignment first in the 'Assignment Generator' tab.")
     elif "evaluation_results" not in st.session_state:
@@ -391,12 +393,13 @@ with evaluator_tab:
     else:
         st.header("Assignment Evaluation & Results")
 
-        assignment = st.session_state["assignment"]
+        assignment = session_store.resolve(st.session_state["assignment"])
         results = st.session_state["evaluation_results"]
 
         # Statistics Section
         st.subheader("Performance Statistics")
-        stats = calculate_statistics()
+        with profiler.section("calculate_statistics"):
+            stats = calculate_statistics()
 
         if stats:
             col1, col2, col3, col4 = st.columns(4)
@@ -441,7 +444,8 @@ with evaluator_tab:
         st.markdown("---")
 
         st.subheader("📝 MCQ Evaluation")
-        mcq_blocks = assignment["mcqs"].split("Correct Answer")
+        with profiler.section("Parse questions"):
+            mcq_blocks = assignment["mcqs"].split("Correct Answer")
 
         for i in range(1, len(mcq_blocks)):
             question_text = mcq_blocks[i - 1].strip()
@@ -470,14 +474,14 @@ with evaluator_tab:
 
         # Long Answer Evaluation
         st.subheader("Long Answer Evaluation")
-        long_questions = [q.strip() for q in assignment["longs"].split("\n") if
-                          q.strip() and re.match(r'^\d+\.', q.strip())]
+        with profiler.section("Parse questions"):
+            long_questions = split_numbered_questions(assignment["longs"])
 
         for i, q in enumerate(long_questions, start=1):
             st.markdown(f"Question {i}: {q}")
 
             if f"long{i}" in results:
-                result = results[f"long{i}"]
+                result = session_store.resolve(results[f"long{i}"])
 
                 with st.expander(f"View Answer & Feedback for Question {i}"):
                     st.markdown("Your Answer:")
@@ -502,14 +506,14 @@ with evaluator_tab:
             st.divider()
 
         st.subheader("Programming Evaluation")
-        prog_questions = [q.strip() for q in assignment["progs"].split("\n") if
-                          q.strip() and re.match(r'^\d+\.', q.strip())]
+        with profiler.section("Parse questions"):
+            prog_questions = split_numbered_questions(assignment["progs"])
 
         for i, q in enumerate(prog_questions, start=1):
             st.markdown(f"Question {i}: {q}")
 
             if f"prog{i}" in results:
-                result = results[f"prog{i}"]
+                result = session_store.resolve(results[f"prog{i}"])
 
                 with st.expander(f"View Code & Analysis for Question {i}"):
                     st.markdown("Submitted Code:")
@@ -560,9 +564,57 @@ with evaluator_tab:
                 st.info(
                     f"Tip: You have {total_questions - total_attempted} unattempted questions. Consider completing them for a better score!")
 
+        st.markdown("---")
+        st.subheader("Export")
+        student_id = st.text_input("Student ID", value="student")
+        # Only marks the instructor actually changed count as overrides; suggested marks are stored inline
+        export_overrides = {}
+        for prefix, state_prefix in (("long", "override"), ("prog", "progmarks")):
+            for key, result in results.items():
+                if not key.startswith(prefix):
+                    continue
+                marks = st.session_state.get(f"{state_prefix}{key[len(prefix):]}", result["suggested_marks"])
+                if marks != result["suggested_marks"]:
+                    export_overrides[key] = marks
+        course_info = default_course_info()
+
+        # Every export is built by a callable when its button is clicked, not on each rerun
+        export_col1, export_col2, export_col3, export_col4, export_col5 = st.columns(5)
+        with export_col1:
+            st.download_button("Grades (CSV)", deferred_grade_export(
+                grades_file(write_grades_csv), assignment, student_id, results, export_overrides),
+                f"grades_{student_id}.csv", "text/csv")
+        with export_col2:
+            st.download_button("Grades (JSONL)", deferred_grade_export(
+                grades_file(write_grades_jsonl), assignment, student_id, results, export_overrides),
+                f"grades_{student_id}.jsonl", "application/jsonl")
+        with export_col3:
+            st.download_button("Grade Report (LaTeX)", deferred_grade_export(
+                lambda assignment, record: render_grade_report_tex(assignment, record, course_info),
+                assignment, student_id, results, export_overrides),
+                f"grade_report_{student_id}.tex", "application/x-tex")
+        with export_col4:
+            st.download_button("Assignment (LaTeX)", lambda: render_assignment_tex(assignment, course_info),
+                               "assignment.tex", "application/x-tex")
+        with export_col5:
+            st.download_button("Answer Key (LaTeX)",
+                               lambda: render_assignment_tex(assignment, course_info, answer_key=True),
+                               "answer_key.tex", "application/x-tex")
+
 # Clean up temp file
-if os.path.exists("temp.pdf"):
-    try:
-        os.remove("temp.pdf")
-    except:
-        pass
\ No newline at end of file
+with profiler.section("temp.pdf cleanup"):
+    if os.path.exists("temp.pdf"):
+        try:
+            os.remove("temp.pdf")
+        except:
+            pass
+
+footprint = session_store.footprint(session_id)
+footprint_slot.caption(f"Session state: {footprint['blobs']} blobs, "
+                       f"{footprint['memory_bytes'] / 1024:.1f} KB in memory, "
+                       f"{footprint['disk_bytes'] / 1024:.1f} KB on disk, "
+                       f"{footprint['shared_bytes'] / 1024:.1f} KB shared")
+
+profiler.finish_rerun()
+if profiler.enabled:
+    render_profiler_sidebar(profiler)
\ No newline at end of file
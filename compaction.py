@@ -0,0 +1,96 @@
+"""
+Compaction pass between PDF extraction and prompting.
+
+Slide decks repeat the course title, slide numbers, university footer and
+copyright line on every page. compact_slides() drops those lines and any bare
+slide number left at the top or bottom of a page, repairs hyphenation and
+whitespace, removes near-empty pages, and returns the text with page
+boundaries kept as "[Page N]" markers.
+"""
+import re
+from collections import Counter
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+def _line_signature(line):
+    signature = re.sub(r'\s+', ' ', line.strip().lower())
+    # Digits in short header/footer lines are masked so "Slide 3 / 40" and "Slide 4 / 40" match
+    if len(signature) <= 40:
+        signature = re.sub(r'\d+', '#', signature)
+    return signature
+
+
+def _is_page_number(line):
+    """A bare slide number such as "7", "- 7 -", "7 / 40" or "7 | 40" (but not "-1" or "3.14")."""
+    return re.fullmatch(r'(?:-\s+)?\d{1,4}(?:\s*[/|]\s*\d{1,4})?(?:\s+-)?', line) is not None
+
+
+def _clean_page(text):
+    text = re.sub(r'(\w)-\n\s*(\w)', r'\1\2', text)       # re-join hyphenated line breaks
+    lines = [re.sub(r'[ \t\f\v]+', ' ', line).strip() for line in text.split("\n")]
+    return [line for line in lines if line]
+
+
+def compact_pages(pages, repeat_ratio=0.5, min_repeat_pages=3, min_page_chars=40):
+    """
+    Removes boilerplate from per-page slide text.
+    Args:
+        pages (list): Text of each PDF page, as returned by read_pdf_pages.
+        repeat_ratio (float): A line is boilerplate when it occurs on at least this fraction of pages.
+        min_repeat_pages (int): ...and on at least this many pages.
+        min_page_chars (int): Pages with less remaining text than this are dropped.
+    Returns:
+        tuple: (list of (page number, compacted text), list of removed line signatures)
+    """
+    cleaned = [_clean_page(page or "") for page in pages]
+
+    occurrences = Counter()
+    for lines in cleaned:
+        occurrences.update({_line_signature(line) for line in lines})
+    threshold = max(min_repeat_pages, repeat_ratio * len(cleaned))
+    boilerplate = {sig for sig, count in occurrences.items() if count >= threshold}
+
+    compacted = []
+    for number, lines in enumerate(cleaned, start=1):
+        body = [line for line in lines if _line_signature(line) not in boilerplate]
+        # A slide number that repetition missed is the first or last line of its page
+        if body and _is_page_number(body[-1]):
+            body.pop()
+        if body and _is_page_number(body[0]):
+            body.pop(0)
+        compacted.append((number, "\n".join(body)))
+
+    kept = [(number, text) for number, text in compacted if len(text) >= min_page_chars]
+    if not kept:
+        # Very short decks: keep whatever text there is rather than prompting with nothing
+        kept = [(number, text) for number, text in compacted if text]
+    return kept, sorted(boilerplate)
+
+
+def compact_slides(pages, **options):
+    """
+    Compacts extracted slides and reports the saving.
+    Args:
+        pages (list): Text of each PDF page.
+        **options: Passed through to compact_pages.
+    Returns:
+        tuple: (compacted text with "[Page N]" markers, report dict)
+    """
+    kept, boilerplate = compact_pages(pages, **options)
+    text = "\n\n".join(f"[Page {number}]\n{body}" for number, body in kept)
+
+    original_tokens = estimate_tokens("".join(page or "" for page in pages))
+    compacted_tokens = estimate_tokens(text)
+    report = {
+        "pages": len(pages),
+        "pages_kept": len(kept),
+        "boilerplate_lines": boilerplate,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "saved_ratio": 1 - compacted_tokens / original_tokens if original_tokens else 0.0
+    }
+    return text, report
@@ -0,0 +1,239 @@
+"""
+Incremental multi-PDF course corpus.
+
+A course folder holds one PDF per lecture. CourseCorpus fingerprints every
+file, re-extracts only new or changed ones through read_pdf_pages, and keeps
+the per-page text in a content-addressed store next to a manifest:
+
+    <store>/manifest.json
+    <store>/pages/<sha256>.json
+
+A file that cannot be read or extracted is recorded in the manifest with its
+error and skipped until its size, mtime or contents change.
+
+Lectures are numbered from the number after "lec"/"lecture" in the file name
+("DSE312_lecture03.pdf" -> 3), else from its last number, and can be selected
+as e.g. "3-7, 9".
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+
+from agent import read_pdf_pages
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def lecture_number(name):
+    """Lecture number of a PDF file name, or None if it has no number."""
+    match = re.search(r'lec(?:ture)?[\s_-]*(\d+)', name, re.IGNORECASE)
+    if match:
+        return int(match.group(1))
+    numbers = re.findall(r'\d+', os.path.splitext(name)[0])
+    return int(numbers[-1]) if numbers else None
+
+
+def parse_lecture_selection(selection, available):
+    """
+    Turn "3-7, 9" into the selected lecture numbers.
+    Args:
+        selection (str): Comma or space separated numbers and "a-b" ranges.
+        available (iterable): Lecture numbers in the course; ranges select only these.
+    Returns:
+        set: Selected lecture numbers (single numbers are kept even if unavailable).
+    Raises:
+        ValueError: If a part is not a number or an ascending range.
+    """
+    available = set(available)
+    lectures = set()
+    for part in re.split(r'[,\s]+', re.sub(r'\s*[-–]\s*', '-', selection.strip())):
+        if not part:
+            continue
+        match = re.fullmatch(r'(\d+)(?:-(\d+))?', part)
+        if not match:
+            raise ValueError(f'"{part}" is not a lecture number or range like 3-7')
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else None
+        if last is None:
+            lectures.add(first)
+        elif last < first:
+            raise ValueError(f'range "{part}" runs backwards')
+        else:
+            lectures.update(n for n in available if first <= n <= last)
+    return lectures
+
+
+class CourseCorpus:
+    """
+    Args:
+        course_dir (str): Folder containing the lecture PDFs.
+        store_dir (str): Where the manifest and page store live (default: <course_dir>/.corpus).
+
+    Attributes:
+        conflicts (dict): Lecture number -> file names left out because another file has that number.
+    """
+
+    def __init__(self, course_dir, store_dir=None):
+        self.course_dir = course_dir
+        self.store_dir = store_dir or os.path.join(course_dir, ".corpus")
+        self.pages_dir = os.path.join(self.store_dir, "pages")
+        self.manifest_path = os.path.join(self.store_dir, "manifest.json")
+        os.makedirs(self.pages_dir, exist_ok=True)
+        self._lock = threading.RLock()
+
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self._pages = {}        # lecture number -> list of page texts, loaded on demand
+        self._lectures = {}     # lecture number -> file name
+        self.conflicts = {}
+        self._index()
+
+    def _index(self):
+        self._lectures = {}
+        self._pages = {}
+        self.conflicts = {}
+        names = sorted(name for name, entry in self.manifest.items() if not entry.get("error"))
+        numbered = {name: lecture_number(name) for name in names}
+        # Files without a number follow the numbered lectures, in name order
+        next_free = max([n for n in numbered.values() if n is not None], default=0) + 1
+        for name in names:
+            lecture = numbered[name]
+            if lecture is None:
+                lecture, next_free = next_free, next_free + 1
+            if lecture in self._lectures:
+                self.conflicts.setdefault(lecture, []).append(name)
+                self.manifest[name]["lecture"] = None
+                continue
+            self._lectures[lecture] = name
+            self.manifest[name]["lecture"] = lecture
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _page_path(self, sha):
+        return os.path.join(self.pages_dir, f"{sha}.json")
+
+    def refresh(self, on_error=print):
+        """
+        Brings the store in line with the PDFs currently in the folder.
+        Returns:
+            dict: lists of file names that were "added", "changed", "removed", "unchanged",
+                  or "failed" (newly unreadable; on_error is called once for each).
+        """
+        with self._lock:
+            return self._refresh(on_error)
+
+    def _record_failure(self, name, message, report, on_error, stat=None, sha=None):
+        entry = self.manifest.get(name)
+        if entry and entry.get("error") == message and stat is None:
+            report["unchanged"].append(name)     # still unreadable for the same reason; already reported
+            return
+        on_error(message)
+        report["failed"].append(name)
+        self.manifest[name] = {"sha256": sha, "size": stat.st_size if stat else None,
+                               "mtime_ns": stat.st_mtime_ns if stat else None, "pages": 0, "error": message}
+
+    def _refresh(self, on_error):
+        report = {"added": [], "changed": [], "removed": [], "unchanged": [], "failed": []}
+        dirty = False
+        present = sorted(name for name in os.listdir(self.course_dir) if name.lower().endswith(".pdf"))
+
+        for name in present:
+            path = os.path.join(self.course_dir, name)
+            entry = self.manifest.get(name)
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                self._record_failure(name, f"Could not read {name}: {e}", report, on_error)
+                continue
+            # Size and mtime unchanged: trust the stored fingerprint (or failure) without re-hashing
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                report["unchanged"].append(name)
+                continue
+            try:
+                sha = file_sha256(path)
+            except OSError as e:
+                self._record_failure(name, f"Could not read {name}: {e}", report, on_error, stat)
+                continue
+
+            if entry and entry["sha256"] == sha:
+                entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+                dirty = True
+                report["unchanged"].append(name)
+                continue
+
+            if not os.path.exists(self._page_path(sha)):
+                errors = []
+                pages = read_pdf_pages(path, errors.append)
+                if pages is None:
+                    self._record_failure(name, f"{name}: {errors[0] if errors else 'no text extracted'}",
+                                         report, on_error, stat, sha)
+                    continue
+                with open(self._page_path(sha), "w", encoding="utf-8") as f:
+                    json.dump(pages, f)
+            else:
+                with open(self._page_path(sha), encoding="utf-8") as f:
+                    pages = json.load(f)
+
+            report["changed" if entry else "added"].append(name)
+            self.manifest[name] = {"sha256": sha, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                                   "pages": len(pages)}
+
+        for name in set(self.manifest) - set(present):
+            del self.manifest[name]
+            report["removed"].append(name)
+
+        if report["added"] or report["changed"] or report["removed"] or report["failed"]:
+            live = {entry["sha256"] for entry in self.manifest.values() if not entry.get("error")}
+            for file_name in os.listdir(self.pages_dir):
+                if file_name[:-len(".json")] not in live:
+                    os.remove(os.path.join(self.pages_dir, file_name))
+            self._index()
+            dirty = True
+
+        if dirty:
+            self._save_manifest()
+        return report
+
+    def failures(self):
+        """Return {file name: error} for PDFs skipped because they could not be read."""
+        return {name: entry["error"] for name, entry in sorted(self.manifest.items()) if entry.get("error")}
+
+    def lectures(self):
+        """Return {lecture number: file name} in lecture order."""
+        return dict(sorted(self._lectures.items()))
+
+    def lecture_pages(self, lecture):
+        with self._lock:
+            if lecture not in self._pages:
+                sha = self.manifest[self._lectures[lecture]]["sha256"]
+                with open(self._page_path(sha), encoding="utf-8") as f:
+                    self._pages[lecture] = json.load(f)
+            return self._pages[lecture]
+
+    def pages(self, lectures):
+        """Pages of the selected lectures (a set of numbers or a string like "3-7"), in lecture order."""
+        if isinstance(lectures, str):
+            lectures = parse_lecture_selection(lectures, self._lectures)
+        if not lectures:
+            raise ValueError("no lectures selected")
+        missing = set(lectures) - set(self._lectures)
+        if missing:
+            raise KeyError(f"no lecture numbered {', '.join(map(str, sorted(missing)))}")
+        pages = []
+        for lecture in sorted(lectures):
+            pages.extend(self.lecture_pages(lecture))
+        return pages
@@ -0,0 +1,289 @@
+"""
+Bulk export of graded results and printable assignment packs.
+
+Grade records (one per student) are streamed to CSV (one row per question) or
+JSONL (one line per student) without holding the course in memory. Printable
+documents are rendered from the LaTeX templates in templates/, each compiled
+once per process and cached; per-student grade reports are rendered across a
+process pool.
+
+A grade record is a dict:
+    {"student_id": str,
+     "evaluation_results": {...},       # as produced by agent.grade_submission
+     "overrides": {"long1": 6, ...}}    # instructor marks, keyed like the results
+
+Run with:
+    python export.py assignment.json records.jsonl --out exports --workers 8 [--pdf]
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import string
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+
+from agent import extract_marks_from_question, get_correct_mcq_answer, split_numbered_questions
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+SECTIONS = (("mcqs", "mcq", "Multiple Choice Questions"),
+            ("longs", "long", "Long Answer Questions"),
+            ("progs", "prog", "Programming Questions"))
+CSV_FIELDS = ["student_id", "question", "section", "max_marks", "attempted", "answer", "correct_answer",
+              "suggested_marks", "final_marks", "overridden", "feedback"]
+
+LATEX_SPECIAL = {"\\": r"\textbackslash{}", "&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#",
+                 "_": r"\_", "{": r"\{", "}": r"\}", "~": r"\textasciitilde{}", "^": r"\textasciicircum{}"}
+
+
+def default_course_info():
+    return {"course_code": "DSE312", "assignment_number": 1, "date": date.today().strftime("%B %d, %Y")}
+
+
+def latex_escape(text):
+    return re.sub(r'[\\&%$#_{}~^]', lambda m: LATEX_SPECIAL[m.group()], str(text))
+
+
+@lru_cache(maxsize=None)
+def load_template(name):
+    """Read and compile a template once per process."""
+    with open(os.path.join(TEMPLATE_DIR, name), encoding="utf-8") as f:
+        return string.Template(f.read())
+
+
+def mcq_blocks(mcqs):
+    """MCQ blocks split on "Correct Answer" and numbered from 1, as the Attempt tab and grading do."""
+    blocks = mcqs.split("Correct Answer")[:-1]
+    # Each block after the first starts with the previous question's ": X" answer
+    return [re.sub(r'^\s*:\s*[A-D]?', '', block).strip() if i else block.strip() for i, block in enumerate(blocks)]
+
+
+def _grade_row(record, section, key, max_marks, result):
+    overrides = record.get("overrides", {})
+    row = {"student_id": record["student_id"], "question": key, "section": section,
+           "max_marks": max_marks, "attempted": bool(result), "answer": "", "correct_answer": "",
+           "suggested_marks": "", "final_marks": 0, "overridden": False, "feedback": ""}
+    if result and section == "mcqs":
+        row.update(answer=result["user_answer"], correct_answer=result["correct_answer"],
+                   final_marks=max_marks if result["correct"] else 0)
+    elif result:
+        row.update(answer=result.get("user_answer", result.get("user_code", "")),
+                   suggested_marks=result["suggested_marks"], feedback=result["feedback"],
+                   final_marks=overrides.get(key, result["suggested_marks"]),
+                   overridden=key in overrides)
+    return row
+
+
+def grade_rows(assignment, record):
+    """
+    Yields one row per question for a student's grade record; unattempted questions score 0.
+    Questions are numbered and marked as the Evaluation tab's statistics do (split_numbered_questions).
+    Final marks follow the Evaluation tab: MCQs score their marks when correct,
+    long and programming answers use the instructor override if given, else the AI suggestion.
+    A graded result whose question the paper no longer lists still gets a row.
+    """
+    results = record.get("evaluation_results", {})
+    exported = set()
+    for section, prefix, _ in SECTIONS:
+        for i, question in enumerate(split_numbered_questions(assignment[section]), start=1):
+            key = f"{prefix}{i}"
+            exported.add(key)
+            yield _grade_row(record, section, key, extract_marks_from_question(question), results.get(key))
+
+    prefixes = {prefix: section for section, prefix, _ in SECTIONS}
+    for key in sorted(set(results) - exported):
+        prefix = re.match(r'[a-z]+', key).group()
+        result = results[key]
+        yield _grade_row(record, prefixes[prefix], key, extract_marks_from_question(result.get("question", "")),
+                         result)
+
+
+def student_summary(assignment, record):
+    """
+    Totals a student's grade record the way the Evaluation tab's Final Score does:
+    total_marks and percentage cover attempted questions only; paper_marks covers every question.
+    """
+    rows = list(grade_rows(assignment, record))
+    attempted = [row for row in rows if row["attempted"]]
+    obtained = sum(row["final_marks"] for row in attempted)
+    total = sum(row["max_marks"] for row in attempted)
+    return {"student_id": record["student_id"], "marks_obtained": obtained, "total_marks": total,
+            "percentage": round(obtained / total * 100, 1) if total else 0.0,
+            "attempted": len(attempted), "question_count": len(rows),
+            "paper_marks": sum(row["max_marks"] for row in rows), "questions": rows}
+
+
+def write_grades_csv(assignment, records, f):
+    """Stream records to a text file as CSV, one row per question; returns the number of students written."""
+    count = 0
+    writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for record in records:
+        writer.writerows(grade_rows(assignment, record))
+        count += 1
+    return count
+
+
+def write_grades_jsonl(assignment, records, f):
+    """Stream records to a text file as JSONL, one summary line per student; returns the number written."""
+    count = 0
+    for record in records:
+        f.write(json.dumps(student_summary(assignment, record)) + "\n")
+        count += 1
+    return count
+
+
+def _question_body(item, with_answer, answer=None):
+    lines = [line for line in item.split("\n") if line.strip()]
+    question = re.sub(r'^\s*\d+\.\s*', '', lines[0])
+    options = [line.strip() for line in lines[1:]]
+    body = latex_escape(question)
+    if options:
+        body += "\n  \\begin{enumerate}[label={}]\n" + "".join(
+            f"    \\item {latex_escape(option)}\n" for option in options) + "  \\end{enumerate}"
+    if with_answer:
+        body += f"\n\n  \\textbf{{Answer: {latex_escape(answer)}}}" if answer else \
+            "\n\n  \\textit{Marked against the rubric.}"
+    return body
+
+
+def section_questions(assignment, section):
+    """(question block, correct answer or None) for each question, numbered as grade_submission numbers them."""
+    if section == "mcqs":
+        return [(block, get_correct_mcq_answer(assignment["mcqs"], i))
+                for i, block in enumerate(mcq_blocks(assignment["mcqs"]), start=1)]
+    return [(question, None) for question in split_numbered_questions(assignment[section])]
+
+
+def render_assignment_tex(assignment, course_info, answer_key=False):
+    """Render the question paper (or, with answer_key=True, the answer key) as LaTeX."""
+    sections, total = [], 0
+    for section, _, title in SECTIONS:
+        items = section_questions(assignment, section)
+        if not items:
+            continue
+        total += sum(extract_marks_from_question(item) for item, _ in items)
+        body = "".join(f"  \\item {_question_body(item, answer_key, answer)}\n" for item, answer in items)
+        sections.append(f"\\section*{{{title}}}\n\\begin{{enumerate}}\n{body}\\end{{enumerate}}\n")
+
+    return load_template("assignment.tex").substitute(
+        course_code=latex_escape(course_info["course_code"]),
+        title="Answer Key" if answer_key else "Question Paper",
+        assignment_number=latex_escape(course_info["assignment_number"]),
+        date=latex_escape(course_info["date"]),
+        total_marks=total,
+        sections="\n".join(sections))
+
+
+def render_grade_report_tex(assignment, record, course_info):
+    summary = student_summary(assignment, record)
+    rows, feedback = [], []
+    for row in summary["questions"]:
+        if not row["attempted"]:
+            outcome = "Not attempted"
+        elif row["section"] == "mcqs":
+            outcome = f"Answered {row['answer']}, correct answer {row['correct_answer']}"
+        else:
+            outcome = f"AI suggested {row['suggested_marks']}" + (" (instructor override)" if row["overridden"] else "")
+            feedback.append(f"\\subsection*{{{row['question']}}}\n"
+                            + latex_escape(row["feedback"]).replace("\n", "\n\n"))
+        rows.append(f"{row['question']} & {latex_escape(outcome)} & {row['final_marks']}/{row['max_marks']} \\\\")
+
+    return load_template("grade_report.tex").substitute(
+        course_code=latex_escape(course_info["course_code"]),
+        assignment_number=latex_escape(course_info["assignment_number"]),
+        date=latex_escape(course_info["date"]),
+        student_id=latex_escape(summary["student_id"]),
+        marks_obtained=summary["marks_obtained"],
+        total_marks=summary["total_marks"],
+        percentage=summary["percentage"],
+        attempted=summary["attempted"],
+        question_count=summary["question_count"],
+        rows="\n".join(rows),
+        feedback=("\\section*{AI Feedback}\n" + "\n\n".join(feedback)) if feedback else "")
+
+
+def compile_pdf(tex_path):
+    """Compile a .tex file next to itself with pdflatex; returns the PDF path."""
+    if shutil.which("pdflatex") is None:
+        raise FileNotFoundError("pdflatex is not installed; export .tex files only or install TeX Live")
+    out_dir = os.path.dirname(os.path.abspath(tex_path))
+    subprocess.run(["pdflatex", "-interaction=nonstopmode", "-halt-on-error", "-output-directory", out_dir,
+                    tex_path], check=True, capture_output=True)
+    return os.path.splitext(tex_path)[0] + ".pdf"
+
+
+def _write_document(path, tex, pdf):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(tex)
+    return compile_pdf(path) if pdf else path
+
+
+def _render_report_job(job):
+    assignment, record, course_info, out_dir, pdf = job
+    safe_id = re.sub(r'[^\w.-]', '_', str(record["student_id"]))
+    path = os.path.join(out_dir, f"grade_report_{safe_id}.tex")
+    return _write_document(path, render_grade_report_tex(assignment, record, course_info), pdf)
+
+
+def render_student_reports(assignment, records, course_info, out_dir, workers=None, pdf=False):
+    """Render one grade report per record across a process pool; returns the written paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = ((assignment, record, course_info, out_dir, pdf) for record in records)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_report_job, jobs, chunksize=16))
+
+
+def render_assignment_pack(assignment, course_info, out_dir, pdf=False):
+    """Write the question paper and answer key; returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    return [_write_document(os.path.join(out_dir, "assignment.tex"),
+                            render_assignment_tex(assignment, course_info), pdf),
+            _write_document(os.path.join(out_dir, "answer_key.tex"),
+                            render_assignment_tex(assignment, course_info, answer_key=True), pdf)]
+
+
+def read_records(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export grades and printable documents for a course")
+    parser.add_argument("assignment", help='JSON file with the generated {"mcqs", "longs", "progs"}')
+    parser.add_argument("records", help="JSONL file with one grade record per student")
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--course-code", default="DSE312")
+    parser.add_argument("--assignment-number", default="1")
+    parser.add_argument("--date", default=None, help="printed date (default: today)")
+    parser.add_argument("--workers", type=int, default=None, help="processes for per-student reports")
+    parser.add_argument("--pdf", action="store_true", help="also compile documents with pdflatex")
+    parser.add_argument("--no-reports", action="store_true", help="skip per-student grade reports")
+    args = parser.parse_args()
+
+    with open(args.assignment, encoding="utf-8") as f:
+        assignment = json.load(f)
+    course_info = default_course_info()
+    course_info.update(course_code=args.course_code, assignment_number=args.assignment_number)
+    if args.date:
+        course_info["date"] = args.date
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "grades.csv"), "w", newline="", encoding="utf-8") as f:
+        students = write_grades_csv(assignment, read_records(args.records), f)
+    with open(os.path.join(args.out, "grades.jsonl"), "w", encoding="utf-8") as f:
+        write_grades_jsonl(assignment, read_records(args.records), f)
+    print(f"Wrote grades for {students} students")
+
+    for path in render_assignment_pack(assignment, course_info, args.out, args.pdf):
+        print(f"Wrote {path}")
+    if not args.no_reports:
+        reports = render_student_reports(assignment, read_records(args.records), course_info,
+                                         os.path.join(args.out, "reports"), args.workers, args.pdf)
+        print(f"Wrote {len(reports)} grade reports to {os.path.join(args.out, 'reports')}")
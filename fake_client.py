@@ -0,0 +1,58 @@
+import re
+import time
+import random
+import threading
+from types import SimpleNamespace
+
+
+class FakeClient:
+    """
+    Local stand-in for genai.Client that answers generate_content calls with
+    well-formed canned text, so the app and service can run without an API key.
+    Args:
+        latency (float): Seconds each call sleeps before answering.
+        jitter (float): Extra random delay in [0, jitter) added per call.
+        error_rate (float): Fraction of calls that raise RuntimeError.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents, config=None):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+            fail = self.error_rate and self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise RuntimeError("FakeClient: injected model error")
+        return SimpleNamespace(text=self._answer(contents))
+
+    def _answer(self, prompt):
+        count = re.search(r'[Gg]enerate (\d+)', prompt)
+        n = int(count.group(1)) if count else 1
+
+        if "multiple-choice" in prompt:
+            return "\n\n".join(
+                f"{i}. Which option is correct for topic {i}? [Marks: 2]\n"
+                f"   A) Option A\n   B) Option B\n   C) Option C\n   D) Option D\n"
+                f"   Correct Answer: {'ABCD'[(i - 1) % 4]}"
+                for i in range(1, n + 1)
+            )
+        if "long-answer" in prompt:
+            return "\n".join(f"{i}. Explain concept {i} in detail. [Marks: 8]" for i in range(1, n + 1))
+        if "programming assignment" in prompt:
+            return "\n".join(f"{i}. Write a program to solve task {i}. [Marks: 10]" for i in range(1, n + 1))
+
+        worth = re.search(r'worth (\d+) marks', prompt)
+        max_marks = int(worth.group(1)) if worth else 0
+        return (f"Feedback: reasonable attempt.\n"
+                f"Suggested marks: {max_marks // 2}/{max_marks}\n"
+                f"Areas for improvement: add more detail.")
@@ -0,0 +1,274 @@
+"""
+Multi-session load test for the Streamlit app.
+
+Drives simulated students through Generate -> Attempt -> Evaluate -> override
+using Streamlit's headless AppTest, with FakeClient standing in for Gemini.
+AppTest is not safe to run on several threads of one interpreter, so every
+concurrent session runs in its own worker process, each warmed up by one
+render before the level is timed. Concurrency is ramped level by level; for
+each level it records per-step latency percentiles, rerun times, per-session
+memory growth and error rate, and reports the level at which the app saturates.
+
+Rerun times are the script's own run time, read from the app's RerunProfiler
+(APP_PROFILE=1), so AppTest's round-trip overhead is reported separately and
+kept out of the SLO. A rerun counts as failed when it raises, times out, or
+renders without the elements the step should produce.
+
+Run with:  python loadtest.py --levels 1,2,4,8,16 --latency 0.5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from streamlit.testing.v1 import AppTest
+
+import agent
+from fake_client import FakeClient
+
+STEPS = ["load", "generate", "attempt", "evaluate", "override"]
+APP_TITLE = "AI-Agent for University Assignment"
+# Steps whose reruns make no model call; their rerun times are what the SLO applies to
+INTERACTIVE_STEPS = ("load", "attempt", "override")
+
+
+def write_sample_pdf(path, pages):
+    """Write a minimal text-only PDF with one page per string (lines split on newlines)."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = " ".join(f"({line}) Tj 0 -16 Td" for line in text.split("\n"))
+        stream = f"BT /F1 12 Tf 50 740 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>")
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF"
+    with open(path, "w", encoding="latin-1") as f:
+        f.write(out)
+
+
+def make_course(course_dir, lectures=3, pages_per_lecture=5):
+    for lecture in range(1, lectures + 1):
+        write_sample_pdf(
+            os.path.join(course_dir, f"lecture{lecture:02d}.pdf"),
+            [f"DSE312 Load Test Course\nLecture {lecture}, slide {page}\n"
+             f"Key idea {lecture}.{page}: gradient descent updates weights along the negative gradient."
+             for page in range(1, pages_per_lecture + 1)])
+
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+
+def run_session(course_dir, timeout):
+    """
+    Runs one simulated student through the whole app (needs APP_PROFILE=1).
+    Returns:
+        dict: app seconds per step, (step, app seconds, round-trip seconds) for every rerun,
+              and the error (if any).
+    """
+    timings, reruns = {}, []
+    step = "load"
+    at = AppTest.from_file("app.py", default_timeout=timeout)
+    last_profiled = None
+
+    def rerun(element=None, expect=None):
+        """Run once; raise if the script crashed, timed out or is missing what it should render."""
+        nonlocal last_profiled
+        start = time.perf_counter()
+        (element.run() if element is not None else at.run())   # raises RuntimeError on timeout
+        roundtrip = time.perf_counter() - start
+        history = at.session_state["profiler"].history if "profiler" in at.session_state else None
+        if not history or history[-1] is last_profiled:
+            raise RuntimeError("rerun did not finish")
+        last_profiled = history[-1]
+        reruns.append((step, last_profiled["total"], roundtrip))
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        # A script thread that died outside the app's code leaves no exception element, just a short page
+        if not any(title.value == APP_TITLE for title in at.title):
+            raise RuntimeError("rerun rendered no app title")
+        if expect and not any(element.value == expect for element in (*at.subheader, *at.success)):
+            raise RuntimeError(f'rerun rendered no "{expect}"')
+        return last_profiled["total"]
+
+    try:
+        timings["load"] = rerun()
+
+        step = "generate"
+        elapsed = rerun(_widget(at.radio, "Slides Source").set_value("Course Folder"))
+        elapsed += rerun(_widget(at.text_input, "Course folder containing one PDF per lecture").set_value(course_dir))
+        elapsed += rerun(_widget(at.text_input, "Lectures to use (e.g. 3-7, 9)").set_value("1-2"))
+        elapsed += rerun(_widget(at.button, "Generate Assignment").click(), expect="Regenerate Questions")
+        timings["generate"] = elapsed
+
+        step = "attempt"
+        elapsed = 0.0
+        for radio in [r for r in at.radio if r.key and r.key.startswith("mcq")]:
+            elapsed += rerun(radio.set_value("A"))
+        for area in [t for t in at.text_area if t.key and t.key.startswith(("long", "prog"))]:
+            elapsed += rerun(area.set_value("print('answer')" if area.key.startswith("prog") else "An answer."))
+        timings["attempt"] = elapsed
+
+        step = "evaluate"
+        timings["evaluate"] = rerun(_widget(at.button, "🔍 Evaluate Assignment").click(),
+                                    expect="Evaluation completed! Check the 'Evaluation' tab for results.")
+
+        step = "override"
+        overrides = [n for n in at.number_input if n.key and n.key.startswith(("override", "progmarks"))]
+        timings["override"] = sum(rerun(n.set_value(n.max)) for n in overrides)
+        error = None
+    except Exception as e:
+        error = f"{step}: {type(e).__name__}: {e}"
+    return {"timings": timings, "reruns": reruns, "error": error}
+
+
+def _init_worker(client_options):
+    """Worker process setup: profile reruns, use the fake model, and render once to warm imports."""
+    os.environ["APP_PROFILE"] = "1"
+    agent.use_client(FakeClient(**client_options))
+    AppTest.from_file("app.py", default_timeout=120).run()
+
+
+def _worker_ready(_):
+    return os.getpid()
+
+
+def _session_in_worker(course_dir, timeout):
+    rss_before = current_rss_bytes()
+    result = run_session(course_dir, timeout)
+    result["rss_growth_bytes"] = current_rss_bytes() - rss_before
+    return result
+
+
+def summarize_level(concurrency, results, wall):
+    """Aggregate the run_session results of one concurrency level."""
+    steps = {}
+    for name in STEPS:
+        values = [r["timings"][name] for r in results if name in r["timings"]]
+        steps[name] = {"p50": percentile(values, 0.5), "p95": percentile(values, 0.95),
+                       "p99": percentile(values, 0.99)}
+    reruns = [r for result in results for r in result["reruns"] if r[0] in INTERACTIVE_STEPS]
+    app_times = [app for _, app, _ in reruns]
+    overheads = [roundtrip - app for _, app, roundtrip in reruns]
+    growth = [r["rss_growth_bytes"] for r in results if "rss_growth_bytes" in r]
+    errors = [r["error"] for r in results if r["error"]]
+    return {
+        "concurrency": concurrency,
+        "sessions": len(results),
+        "wall_seconds": wall,
+        "sessions_per_second": len(results) / wall if wall else 0.0,
+        "steps": steps,
+        "rerun": {"count": len(reruns), "p50": percentile(app_times, 0.5), "p95": percentile(app_times, 0.95),
+                  "harness_overhead_p50": percentile(overheads, 0.5)},
+        "session_rss_growth_bytes": {"p50": percentile(growth, 0.5), "max": max(growth, default=0)},
+        "error_rate": len(errors) / len(results) if results else 0.0,
+        "errors": errors[:5]
+    }
+
+
+def run_level(concurrency, sessions, course_dir, timeout, client_options):
+    """Run sessions across `concurrency` worker processes, one AppTest session at a time per process."""
+    with ProcessPoolExecutor(max_workers=concurrency, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(client_options,)) as pool:
+        # Start and warm every worker before the clock starts
+        list(pool.map(_worker_ready, range(concurrency)))
+        start = time.perf_counter()
+        results = list(pool.map(_session_in_worker, [course_dir] * sessions, [timeout] * sessions))
+        wall = time.perf_counter() - start
+    return summarize_level(concurrency, results, wall)
+
+
+def find_saturation(levels, slo_p95, max_error_rate):
+    """
+    First concurrency level that breaks the rerun p95 SLO, exceeds the error budget,
+    or fails to raise throughput by at least 10% over the previous level.
+    """
+    for previous, level in zip([None] + levels, levels):
+        if level["rerun"]["p95"] > slo_p95:
+            return level["concurrency"], f"rerun p95 {level['rerun']['p95']:.3f}s > {slo_p95}s"
+        if level["error_rate"] > max_error_rate:
+            return level["concurrency"], f"error rate {level['error_rate']:.1%} > {max_error_rate:.1%}"
+        if previous and level["sessions_per_second"] < previous["sessions_per_second"] * 1.1:
+            return level["concurrency"], "throughput stopped scaling"
+    return None, "not reached"
+
+
+def print_report(levels, saturation):
+    print(f"{'conc':>5} {'sess/s':>7} {'rerun p50':>10} {'rerun p95':>10} {'harness':>8} "
+          + " ".join(f"{name + ' p95':>13}" for name in STEPS) + f" {'MB/sess':>8} {'errors':>7}")
+    for level in levels:
+        print(f"{level['concurrency']:>5} {level['sessions_per_second']:>7.2f} "
+              f"{level['rerun']['p50']:>10.3f} {level['rerun']['p95']:>10.3f} "
+              f"{level['rerun']['harness_overhead_p50']:>8.3f} "
+              + " ".join(f"{level['steps'][name]['p95']:>13.3f}" for name in STEPS)
+              + f" {level['session_rss_growth_bytes']['p50'] / 2 ** 20:>8.1f} {level['error_rate']:>7.1%}")
+    concurrency, reason = saturation
+    print(f"\nSaturation point: {concurrency if concurrency else 'none within tested levels'} ({reason})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ramp simulated sessions against app.py")
+    parser.add_argument("--levels", default="1,2,4,8", help="comma-separated concurrency levels")
+    parser.add_argument("--sessions-per-level", type=int, default=None,
+                        help="sessions run at each level (default: 2 x concurrency)")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake model latency per call (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="extra random model latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of model calls that fail")
+    parser.add_argument("--slo-p95", type=float, default=0.1, help="rerun p95 target (s of script run time)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout (s)")
+    parser.add_argument("--json", help="also write the full results to this file")
+    args = parser.parse_args()
+
+    client_options = {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate}
+    # Run the worker functions from the importable module: AppTest replaces __main__ inside each worker,
+    # so functions pickled as __main__.* could not be found there
+    import loadtest
+
+    with tempfile.TemporaryDirectory(prefix="loadtest_course_") as course_dir:
+        make_course(course_dir)
+        os.environ["COURSE_ROOT"] = course_dir      # inherited by the worker processes
+        results = []
+        for concurrency in [int(level) for level in args.levels.split(",")]:
+            sessions = args.sessions_per_level or 2 * concurrency
+            print(f"Running {sessions} sessions at concurrency {concurrency}...")
+            results.append(loadtest.run_level(concurrency, sessions, course_dir, args.timeout,
+                                                  client_options))
+
+    saturation = find_saturation(results, args.slo_p95, args.max_error_rate)
+    print_report(results, saturation)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"levels": results, "saturation": {"concurrency": saturation[0], "reason": saturation[1]}},
+                      f, indent=2)
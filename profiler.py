@@ -0,0 +1,157 @@
+"""
+Opt-in per-rerun profiling for the Streamlit app.
+
+Every widget interaction reruns app.py from the top. RerunProfiler times named
+sections of each rerun, keeps a rolling history, and can capture a cProfile or
+sampling profile of a single rerun on demand. When disabled every call is a
+no-op, so the instrumentation can stay in the app permanently.
+"""
+import cProfile
+import contextlib
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+
+class StackSampler:
+    """Samples one thread's Python stack at a fixed interval (stdlib-only sampling profiler)."""
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        """Stacks in collapsed "a;b;c count" form, as read by flamegraph tools."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self, limit=25):
+        inclusive = Counter()
+        for stack, count in self.stacks.items():
+            for frame in set(stack.split(";")):
+                inclusive[frame.rsplit(":", 1)[0]] += count
+        total = sum(self.stacks.values()) or 1
+        lines = [f"{sum(self.stacks.values())} samples every {self.interval * 1000:.0f} ms"]
+        lines += [f"{count / total:6.1%}  {frame}" for frame, count in inclusive.most_common(limit)]
+        return "\n".join(lines)
+
+
+class RerunProfiler:
+    """
+    Args:
+        enabled (bool): When False, section() and the rerun hooks do nothing.
+        history (int): Number of past reruns kept.
+    """
+
+    def __init__(self, enabled=False, history=50):
+        self.enabled = enabled
+        self.history = deque(maxlen=history)
+        self.capture_next = None        # None, "cprofile" or "sampling"
+        self.last_capture = None        # {"mode", "summary", "raw"} of the latest captured rerun
+        self._current = None
+        self._collector = None
+
+    def start_rerun(self):
+        if not self.enabled:
+            return
+        # A rerun interrupted by a newer one never reaches finish_rerun; drop its capture
+        if isinstance(self._collector, cProfile.Profile):
+            self._collector.disable()
+        elif isinstance(self._collector, StackSampler):
+            self._collector.stop()
+        self._collector = None
+        self._current = {"started": time.time(), "start": time.perf_counter(), "sections": {}}
+        if self.capture_next == "cprofile":
+            self._collector = cProfile.Profile()
+            self._collector.enable()
+        elif self.capture_next == "sampling":
+            self._collector = StackSampler(threading.get_ident())
+            self._collector.start()
+        self.capture_next = None
+
+    def section(self, name):
+        if not self.enabled or self._current is None:
+            return contextlib.nullcontext()
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            sections = self._current["sections"]
+            sections[name] = sections.get(name, 0.0) + time.perf_counter() - start
+
+    def finish_rerun(self):
+        if not self.enabled or self._current is None:
+            return
+        rerun = {"started": self._current["started"],
+                 "total": time.perf_counter() - self._current["start"],
+                 "sections": self._current["sections"]}
+        self.history.append(rerun)
+        self._current = None
+
+        if isinstance(self._collector, cProfile.Profile):
+            self._collector.disable()
+            out = io.StringIO()
+            pstats.Stats(self._collector, stream=out).sort_stats("cumulative").print_stats(25)
+            self.last_capture = {"mode": "cprofile", "summary": out.getvalue(), "raw": self._collector}
+        elif isinstance(self._collector, StackSampler):
+            self._collector.stop()
+            self.last_capture = {"mode": "sampling", "summary": self._collector.summary(),
+                                 "raw": self._collector}
+        self._collector = None
+
+    def averages(self):
+        """Mean seconds per section (and "total") over the rolling history."""
+        totals, counts = Counter(), Counter()
+        for rerun in self.history:
+            totals["total"] += rerun["total"]
+            counts["total"] += 1
+            for name, seconds in rerun["sections"].items():
+                totals[name] += seconds
+                counts[name] += 1
+        return {name: totals[name] / counts[name] for name in totals}
+
+    def write(self, directory="profiles"):
+        """Write the history (and the last capture, if any) to files; returns the paths written."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        paths = [os.path.join(directory, f"reruns-{stamp}.json")]
+        with open(paths[0], "w") as f:
+            json.dump({"averages": self.averages(), "reruns": list(self.history)}, f, indent=2)
+
+        if self.last_capture and self.last_capture["mode"] == "cprofile":
+            paths.append(os.path.join(directory, f"rerun-{stamp}.prof"))
+            self.last_capture["raw"].dump_stats(paths[-1])
+        elif self.last_capture:
+            paths.append(os.path.join(directory, f"rerun-{stamp}.folded"))
+            with open(paths[-1], "w") as f:
+                f.write(self.last_capture["raw"].folded())
+        return paths
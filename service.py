@@ -0,0 +1,345 @@
+"""
+Headless HTTP grading service for LMS integration.
+
+Exposes the same generation and grading logic as the Streamlit app:
+
+    POST /generate      {"pdf_base64" | "slides_text", "mcq", "long", "prog"}
+    POST /grade         {"assignment": {...}, "answers": {"mcq": {...}, "long": {...}, "prog": {...}}}
+    GET  /jobs/<id>     poll a job started by either POST
+    GET  /health
+
+POSTs are queued as jobs and answered with 202 + Location; pass "?wait=<seconds>"
+to get the finished result inline (200) when it completes within that time.
+Send an "Idempotency-Key" header so retried submissions map onto the same job
+instead of being graded twice. Keys of failed jobs are released, so retrying
+after a transient model error runs the job again.
+
+Run with:  python service.py --port 8080 [--fake-latency 0.5]
+"""
+import argparse
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import json
+import time
+import uuid
+from urllib.parse import urlsplit, parse_qs
+
+import agent
+from compaction import compact_slides
+
+MAX_WAIT_SECONDS = 30
+# Questions per section a generate request may ask for: (min, max), as in the app's inputs
+QUESTION_LIMITS = {"mcq": (1, 10), "long": (1, 5), "prog": (1, 5)}
+
+STATUS_TEXT = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 408: "Request Timeout", 409: "Conflict", 413: "Payload Too Large",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+def run_generate(payload):
+    if "pdf_base64" in payload:
+        pdf = io.BytesIO(base64.b64decode(payload["pdf_base64"]))
+        pages = agent.read_pdf_pages(pdf)
+        slides_text = compact_slides(pages)[0] if pages else None
+    else:
+        slides_text = payload.get("slides_text")
+    if not slides_text:
+        raise ValueError("no slide text could be read from the request")
+
+    return {
+        "mcqs": agent.generate_mcq_questions(slides_text, int(payload.get("mcq", 3))),
+        "longs": agent.generate_long_answer_questions(slides_text, int(payload.get("long", 2))),
+        "progs": agent.generate_programming_questions(slides_text, int(payload.get("prog", 2)))
+    }
+
+
+def run_grade(payload):
+    assignment = payload["assignment"]
+    answers = payload.get("answers", {})
+    by_number = {section: {int(k): v for k, v in answers.get(section, {}).items()}
+                 for section in ("mcq", "long", "prog")}
+    return agent.grade_submission(assignment, by_number["mcq"], by_number["long"], by_number["prog"])
+
+
+JOB_RUNNERS = {"generate": run_generate, "grade": run_grade}
+
+
+def validate_payload(kind, payload):
+    """Check a request body before it is queued; raises ValueError with a message for the client."""
+    if kind == "generate":
+        for field, (low, high) in QUESTION_LIMITS.items():
+            value = payload.get(field, low)
+            if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+                raise ValueError(f"'{field}' must be an integer from {low} to {high}")
+        if "pdf_base64" in payload:
+            try:
+                if not base64.b64decode(payload["pdf_base64"], validate=True):
+                    raise ValueError
+            except (binascii.Error, TypeError, ValueError):
+                raise ValueError("'pdf_base64' must be non-empty base64") from None
+        elif not isinstance(payload.get("slides_text"), str) or not payload["slides_text"].strip():
+            raise ValueError("send 'pdf_base64' or a non-empty 'slides_text'")
+        return
+
+    assignment = payload.get("assignment")
+    if not isinstance(assignment, dict) or not all(isinstance(assignment.get(section), str)
+                                                   for section in ("mcqs", "longs", "progs")):
+        raise ValueError("'assignment' must be an object with 'mcqs', 'longs' and 'progs' text")
+    answers = payload.get("answers", {})
+    if not isinstance(answers, dict):
+        raise ValueError("'answers' must be an object")
+    for section in ("mcq", "long", "prog"):
+        section_answers = answers.get(section, {})
+        if not isinstance(section_answers, dict) or not all(
+                str(number).isdigit() and isinstance(answer, str) for number, answer in section_answers.items()):
+            raise ValueError(f"'answers.{section}' must map question numbers to text")
+
+
+class GradingService:
+    """
+    Job queue behind the HTTP endpoints.
+    Args:
+        max_concurrency (int): Jobs allowed to call the model at the same time.
+        max_pending (int): Unfinished jobs accepted before new ones get 503.
+        job_ttl (float): Seconds a finished job (and its idempotency key) is kept.
+    """
+
+    def __init__(self, max_concurrency=4, max_pending=256, job_ttl=3600):
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self.idempotency = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks = set()
+
+    def pending(self):
+        return sum(1 for job in self.jobs.values() if job["status"] in ("queued", "running"))
+
+    def _expire(self):
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job["finished"] and now - job["finished"] > self.job_ttl:
+                del self.jobs[job_id]
+                if job["idempotency_key"]:
+                    self.idempotency.pop(job["idempotency_key"], None)
+
+    def submit(self, kind, payload, idempotency_key=None):
+        """Return (job, created); raises LookupError on an idempotency key reused for another payload."""
+        self._expire()
+        digest = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+        if idempotency_key:
+            key = (kind, idempotency_key)
+            if key in self.idempotency:
+                job = self.jobs[self.idempotency[key]]
+                if job["digest"] != digest:
+                    raise LookupError("Idempotency-Key was already used with a different payload")
+                return job, False
+
+        job = {"id": uuid.uuid4().hex, "kind": kind, "status": "queued", "result": None, "error": None,
+               "created": time.time(), "finished": None, "digest": digest,
+               "idempotency_key": (kind, idempotency_key) if idempotency_key else None}
+        self.jobs[job["id"]] = job
+        if idempotency_key:
+            self.idempotency[job["idempotency_key"]] = job["id"]
+
+        task = asyncio.create_task(self._run(job, payload))
+        job["done"] = task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job, True
+
+    async def _run(self, job, payload):
+        async with self._semaphore:
+            job["status"] = "running"
+            try:
+                job["result"] = await asyncio.to_thread(JOB_RUNNERS[job["kind"]], payload)
+                job["status"] = "done"
+            except Exception as e:
+                job["error"] = f"{type(e).__name__}: {e}"
+                job["status"] = "failed"
+                # Let a retry with the same key run the job again instead of replaying the failure
+                if job["idempotency_key"] and self.idempotency.get(job["idempotency_key"]) == job["id"]:
+                    del self.idempotency[job["idempotency_key"]]
+            finally:
+                job["finished"] = time.time()
+
+    async def wait(self, job, timeout):
+        if timeout > 0 and job["status"] in ("queued", "running"):
+            await asyncio.wait({job["done"]}, timeout=timeout)
+
+
+def parse_wait(query):
+    """Seconds to wait for a job from "?wait=", capped at MAX_WAIT_SECONDS; raises ValueError."""
+    wait = float(query.get("wait", ["0"])[0])
+    if not 0 <= wait < float("inf"):
+        raise ValueError("wait must be a non-negative number of seconds")
+    return min(wait, MAX_WAIT_SECONDS)
+
+
+def job_view(job):
+    view = {"id": job["id"], "kind": job["kind"], "status": job["status"]}
+    if job["status"] == "done":
+        view["result"] = job["result"]
+    elif job["status"] == "failed":
+        view["error"] = job["error"]
+    return view
+
+
+def job_response(job):
+    headers = {"Location": f"/jobs/{job['id']}"}
+    if job["status"] in ("queued", "running"):
+        return 202, job_view(job), headers
+    return 200, job_view(job), headers
+
+
+class HttpServer:
+    """
+    Minimal HTTP/1.1 front end (one request per connection) for a GradingService.
+    Args:
+        service (GradingService): Where jobs are queued.
+        max_body (int): Largest request body accepted, in bytes.
+        read_timeout (float): Seconds a client has to send the whole request.
+    """
+
+    def __init__(self, service, max_body=20 * 1024 * 1024, read_timeout=30):
+        self.service = service
+        self.max_body = max_body
+        self.read_timeout = read_timeout
+
+    async def handle_connection(self, reader, writer):
+        try:
+            status, body, headers = await self._handle_request(reader)
+        except Exception as e:
+            status, body, headers = 500, {"error": f"{type(e).__name__}: {e}"}, {}
+        payload = json.dumps(body).encode()
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(payload)}",
+                "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """Return (method, target, headers, body), or a (status, body, headers) error response."""
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            return 400, {"error": "empty request"}, {}
+        parts = request_line.split(" ")
+        if len(parts) != 3:
+            return 400, {"error": "malformed request line"}, {}
+        method, target, _ = parts
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            return 400, {"error": "invalid Content-Length"}, {}
+        if length < 0:
+            return 400, {"error": "invalid Content-Length"}, {}
+        if length > self.max_body:
+            return 413, {"error": "request body too large"}, {}
+        raw = await reader.readexactly(length) if length else b""
+        return method, target, headers, raw
+
+    async def _handle_request(self, reader):
+        try:
+            request = await asyncio.wait_for(self._read_request(reader), self.read_timeout)
+        except asyncio.TimeoutError:
+            return 408, {"error": f"request not received within {self.read_timeout}s"}, {}
+        except asyncio.IncompleteReadError:
+            return 400, {"error": "request body shorter than Content-Length"}, {}
+        if isinstance(request[0], int):
+            return request
+        method, target, headers, raw = request
+
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        path = url.path.rstrip("/")
+        try:
+            wait = parse_wait(query)
+        except ValueError as e:
+            return 400, {"error": f"invalid wait: {e}"}, {}
+
+        if path == "/health":
+            return 200, {"status": "ok", "pending_jobs": self.service.pending()}, {}
+
+        if path.startswith("/jobs/"):
+            if method != "GET":
+                return 405, {"error": "use GET"}, {}
+            job = self.service.jobs.get(path[len("/jobs/"):])
+            if job is None:
+                return 404, {"error": "unknown job"}, {}
+            await self.service.wait(job, wait)
+            return job_response(job)
+
+        kind = path.lstrip("/")
+        if kind not in JOB_RUNNERS:
+            return 404, {"error": f"no route for {path}"}, {}
+        if method != "POST":
+            return 405, {"error": "use POST"}, {}
+
+        try:
+            payload = json.loads(raw or b"{}")
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"invalid JSON: {e}"}, {}
+        if not isinstance(payload, dict):
+            return 400, {"error": "request body must be a JSON object"}, {}
+        try:
+            validate_payload(kind, payload)
+        except ValueError as e:
+            return 400, {"error": str(e)}, {}
+
+        idempotency_key = headers.get("idempotency-key")
+        if self.service.pending() >= self.service.max_pending and not (
+                idempotency_key and (kind, idempotency_key) in self.service.idempotency):
+            return 503, {"error": "too many pending jobs, retry later"}, {"Retry-After": "5"}
+
+        try:
+            job, _ = self.service.submit(kind, payload, idempotency_key)
+        except LookupError as e:
+            return 409, {"error": str(e)}, {}
+
+        await self.service.wait(job, wait)
+        return job_response(job)
+
+
+async def serve(host="127.0.0.1", port=8080, max_concurrency=4, max_pending=256):
+    service = GradingService(max_concurrency=max_concurrency, max_pending=max_pending)
+    server = await asyncio.start_server(HttpServer(service).handle_connection, host, port)
+    print(f"Grading service listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP service for assignment generation and grading")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="model calls allowed in flight at once")
+    parser.add_argument("--max-pending", type=int, default=256,
+                        help="unfinished jobs accepted before returning 503")
+    parser.add_argument("--fake-latency", type=float, default=None,
+                        help="use the local FakeClient with this per-call latency instead of Gemini")
+    args = parser.parse_args()
+
+    if args.fake_latency is not None:
+        from fake_client import FakeClient
+        agent.use_client(FakeClient(latency=args.fake_latency))
+
+    asyncio.run(serve(args.host, args.port, args.max_concurrency, args.max_pending))
@@ -0,0 +1,209 @@
+"""
+Bounded, shared storage for heavy per-session state.
+
+Streamlit sessions keep only small BlobHandle values in st.session_state; the
+text itself (assignment sections, answers, AI feedback) lives once in a shared
+content-addressed store, so every student on the same assignment shares one
+copy. Blobs of idle sessions, and the least recently used blobs once the memory
+cap is exceeded, are spilled to disk and reloaded transparently on access.
+
+Each session holds a reference count per blob: release_fields() drops the
+references of handles a session has replaced, and sessions idle past
+expire_seconds are released outright. Blobs nobody references are deleted
+from memory and disk.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter, OrderedDict, namedtuple
+
+BlobHandle = namedtuple("BlobHandle", ["digest", "size"])
+
+
+class SessionStateManager:
+    """
+    Args:
+        memory_cap_bytes (int): Upper bound on blob bytes held in memory.
+        idle_seconds (float): Sessions untouched for this long have their blobs spilled.
+        expire_seconds (float): Sessions untouched for this long are released entirely.
+        spill_dir (str): Directory for spilled blobs (a temp dir, removed on close, by default).
+    """
+
+    def __init__(self, memory_cap_bytes=64 * 1024 * 1024, idle_seconds=600, expire_seconds=6 * 3600,
+                 spill_dir=None):
+        self.memory_cap_bytes = memory_cap_bytes
+        self.idle_seconds = idle_seconds
+        self.expire_seconds = expire_seconds
+        if spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="session_blobs_")
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_dir, ignore_errors=True)
+        else:
+            self.spill_dir = spill_dir
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._cleanup = None
+
+        self._lock = threading.RLock()
+        self._memory = OrderedDict()   # digest -> text, in LRU order
+        self._memory_bytes = 0
+        self._on_disk = set()
+        self._sizes = {}               # digest -> size in bytes
+        self._owners = {}              # digest -> set of session ids
+        self._sessions = {}            # session id -> {"blobs": Counter of digests, "last_seen": float}
+
+    def _session(self, session_id):
+        return self._sessions.setdefault(session_id, {"blobs": Counter(), "last_seen": time.time()})
+
+    def _path(self, digest):
+        return os.path.join(self.spill_dir, f"{digest}.txt")
+
+    def is_live(self, session_id):
+        """False for sessions never seen or already expired (their handles no longer resolve)."""
+        with self._lock:
+            return session_id in self._sessions
+
+    def touch(self, session_id):
+        with self._lock:
+            self._session(session_id)["last_seen"] = time.time()
+
+    def put(self, session_id, text):
+        """Store text for a session and return its handle; identical text is stored once."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            session = self._session(session_id)
+            session["last_seen"] = time.time()
+            session["blobs"][digest] += 1
+            self._owners.setdefault(digest, set()).add(session_id)
+            if digest in self._memory:
+                self._memory.move_to_end(digest)
+            elif digest not in self._on_disk:
+                self._sizes[digest] = len(data)
+                self._memory[digest] = text
+                self._memory_bytes += len(data)
+                self._enforce_cap()
+        return BlobHandle(digest, len(data))
+
+    def get(self, handle):
+        with self._lock:
+            if handle.digest in self._memory:
+                self._memory.move_to_end(handle.digest)
+                return self._memory[handle.digest]
+            if handle.digest not in self._on_disk:
+                raise KeyError(f"unknown blob {handle.digest}")
+            with open(self._path(handle.digest), encoding="utf-8") as f:
+                text = f.read()
+            self._memory[handle.digest] = text
+            self._memory_bytes += self._sizes[handle.digest]
+            self._enforce_cap(keep=handle.digest)
+            return text
+
+    def put_fields(self, session_id, mapping, fields):
+        """Return a copy of mapping with the given string fields replaced by handles."""
+        return {key: self.put(session_id, value) if key in fields and isinstance(value, str) else value
+                for key, value in mapping.items()}
+
+    def release_fields(self, session_id, mapping):
+        """Drop the session's references to every handle in mapping (e.g. after replacing it)."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return
+            for value in mapping.values():
+                if isinstance(value, BlobHandle) and session["blobs"][value.digest] > 0:
+                    session["blobs"][value.digest] -= 1
+                    if not session["blobs"][value.digest]:
+                        del session["blobs"][value.digest]
+                        self._drop_owner(value.digest, session_id)
+
+    def resolve(self, mapping):
+        """Return a copy of mapping with every handle replaced by its text."""
+        return {key: self.get(value) if isinstance(value, BlobHandle) else value
+                for key, value in mapping.items()}
+
+    def _spill(self, digest):
+        if digest not in self._on_disk:
+            with open(self._path(digest), "w", encoding="utf-8") as f:
+                f.write(self._memory[digest])
+            self._on_disk.add(digest)
+        del self._memory[digest]
+        self._memory_bytes -= self._sizes[digest]
+
+    def _enforce_cap(self, keep=None):
+        for digest in list(self._memory):
+            if self._memory_bytes <= self.memory_cap_bytes:
+                break
+            if digest != keep:
+                self._spill(digest)
+
+    def evict_idle(self):
+        """
+        Release sessions idle longer than expire_seconds, then spill blobs only
+        referenced by sessions idle longer than idle_seconds.
+        """
+        now = time.time()
+        with self._lock:
+            for sid in [sid for sid, s in self._sessions.items() if now - s["last_seen"] >= self.expire_seconds]:
+                self.release(sid)
+            active = {sid for sid, s in self._sessions.items() if now - s["last_seen"] < self.idle_seconds}
+            for digest in list(self._memory):
+                if not self._owners.get(digest, set()) & active:
+                    self._spill(digest)
+
+    def release(self, session_id):
+        """Forget a session; blobs no other session references are deleted."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return
+            for digest in session["blobs"]:
+                self._drop_owner(digest, session_id)
+
+    def _drop_owner(self, digest, session_id):
+        owners = self._owners.get(digest, set())
+        owners.discard(session_id)
+        if owners:
+            return
+        self._owners.pop(digest, None)
+        if digest in self._memory:
+            del self._memory[digest]
+            self._memory_bytes -= self._sizes[digest]
+        if digest in self._on_disk:
+            self._on_disk.discard(digest)
+            os.remove(self._path(digest))
+        del self._sizes[digest]
+
+    def close(self):
+        """Forget every session and remove the spill directory if this manager created it."""
+        with self._lock:
+            for session_id in list(self._sessions):
+                self.release(session_id)
+            if self._cleanup is not None:
+                self._cleanup()
+
+    def footprint(self, session_id):
+        """
+        Reports how much blob data a session references.
+        Returns:
+            dict: blob count, bytes in memory/on disk, and the bytes it shares with other sessions.
+        """
+        with self._lock:
+            blobs = self._sessions.get(session_id, {"blobs": Counter()})["blobs"]
+            return {
+                "blobs": len(blobs),
+                "memory_bytes": sum(self._sizes[d] for d in blobs if d in self._memory),
+                "disk_bytes": sum(self._sizes[d] for d in blobs if d not in self._memory),
+                "shared_bytes": sum(self._sizes[d] for d in blobs if len(self._owners[d]) > 1)
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "blobs": len(self._sizes),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": sum(self._sizes[d] for d in self._on_disk if d not in self._memory)
+            }
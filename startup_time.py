@@ -0,0 +1,101 @@
+"""
+Cold-start measurement for the app's modules.
+
+Each sample runs in a fresh interpreter so nothing is already imported:
+
+  * import agent      - what the service, load test and corpus tools pay
+  * first model call  - import + one generate call through the fake client,
+                        which must not pull in the Gemini SDK (google.genai)
+  * first app render  - import + one headless AppTest run of app.py (fake model client)
+
+It also lists the slowest imports (from python -X importtime) of the agent
+import, and exits non-zero when the median import time exceeds --max-import-ms
+so it can guard against regressions in CI.
+
+Run with:  python startup_time.py --runs 5 --max-import-ms 50
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import agent
+print(time.perf_counter() - start)
+"""
+
+FIRST_CALL_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import agent
+agent.generate_mcq_questions("slides", 1)
+elapsed = time.perf_counter() - start
+assert "google.genai" not in sys.modules, "fake client call imported google.genai"
+print(elapsed)
+"""
+
+FIRST_RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+
+def run_snippet(snippet, extra_args=()):
+    env = dict(os.environ, AGENT_MODEL_CLIENT="fake")
+    result = subprocess.run([sys.executable, *extra_args, "-c", snippet], capture_output=True, text=True,
+                            env=env, cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+    return result
+
+
+def measure(snippet, runs):
+    return [float(run_snippet(snippet).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+
+
+def slowest_imports(limit=10):
+    """Return (cumulative microseconds, module) for the slowest imports triggered by `import agent`."""
+    stderr = run_snippet("import agent", ("-X", "importtime")).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start time of agent.py and app.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-render", action="store_true", help="skip the headless app render")
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="fail if the median `import agent` time exceeds this")
+    args = parser.parse_args()
+
+    import_times = measure(IMPORT_SNIPPET, args.runs)
+    print(f"import agent:      median {statistics.median(import_times) * 1000:8.1f} ms "
+          f"(min {min(import_times) * 1000:.1f}, max {max(import_times) * 1000:.1f})")
+
+    call_times = measure(FIRST_CALL_SNIPPET, args.runs)
+    print(f"first model call:  median {statistics.median(call_times) * 1000:8.1f} ms "
+          f"(min {min(call_times) * 1000:.1f}, max {max(call_times) * 1000:.1f})")
+
+    if not args.skip_render:
+        render_times = measure(FIRST_RENDER_SNIPPET, args.runs)
+        print(f"first app render:  median {statistics.median(render_times) * 1000:8.1f} ms "
+              f"(min {min(render_times) * 1000:.1f}, max {max(render_times) * 1000:.1f})")
+
+    print("\nSlowest imports under `import agent` (cumulative):")
+    for microseconds, module in slowest_imports():
+        print(f"  {microseconds / 1000:8.1f} ms  {module}")
+
+    if args.max_import_ms is not None and statistics.median(import_times) * 1000 > args.max_import_ms:
+        print(f"\nFAIL: import agent exceeds {args.max_import_ms} ms")
+        sys.exit(1)
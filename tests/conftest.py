@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import agent
+from fake_client import FakeClient
+
+
+@pytest.fixture
+def fake_client():
+    """Route every model call through a fresh FakeClient for the duration of a test."""
+    client = FakeClient(seed=0)
+    agent.use_client(client)
+    yield client
+    agent.set_client_provider(None)
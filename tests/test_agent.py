@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import agent
+from agent import extract_marks_from_question, grade_submission, replace_question, split_section_items
+
+MCQS = ("1. What does a gradient point towards? [Marks: 2]\n"
+        "   A) Steepest ascent\n   B) Steepest descent\n   C) The origin\n   D) A minimum\n"
+        "   Correct Answer: A\n\n"
+        "2. What does the learning rate scale? [Marks: 3]\n"
+        "   A) Batch size\n   B) Step size\n   C) Epochs\n   D) Layers\n"
+        "   Correct Answer: B")
+LONGS = "1. Explain backpropagation. [Marks: 8]\n\n2. Compare SGD and Adam. [Marks: 6]"
+
+
+def test_replace_question_keeps_the_rest_and_renumbers():
+    section = replace_question(LONGS, 1, "1. Explain the chain rule. [Marks: 8]")
+    assert split_section_items(section) == ["1. Explain the chain rule. [Marks: 8]",
+                                            "2. Compare SGD and Adam. [Marks: 6]"]
+
+
+def test_replace_question_restores_original_marks():
+    section = replace_question(LONGS, 2, "1. Compare momentum and RMSProp. [Marks: 10]")
+    assert extract_marks_from_question(split_section_items(section)[1]) == 6
+
+    section = replace_question(LONGS, 1, "1. Explain the chain rule.")
+    assert split_section_items(section)[0] == "1. Explain the chain rule. [Marks: 8]"
+
+
+def test_replaced_mcq_is_graded_with_its_own_key():
+    new = ("1. Which optimiser adapts per-parameter rates? [Marks: 5]\n"
+           "   A) SGD\n   B) Momentum\n   C) Newton\n   D) Adam\n   Correct Answer: D")
+    assignment = {"mcqs": replace_question(MCQS, 2, new), "longs": "", "progs": ""}
+    assert extract_marks_from_question(split_section_items(assignment["mcqs"])[1]) == 3
+
+    results = grade_submission(assignment, {1: "A", 2: "D"}, {}, {})
+    assert results["mcq1"]["correct"] and results["mcq2"]["correct"]
+    assert results["mcq2"]["correct_answer"] == "D"
+
+
+@pytest.mark.parametrize("reply", [
+    "1. Which optimiser? [Marks: 3]\n   A) SGD\n   B) Adam\n   C) Newton\n   D) None\n   **Correct Answer:** D",
+    "1. Which optimiser? [Marks: 3]\n   A) SGD\n   B) Adam\n   C) Newton\n   D) None",
+    "Sorry, I cannot help with that.",
+])
+def test_replace_mcq_rejects_replies_without_an_answer_line(reply):
+    with pytest.raises(ValueError):
+        replace_question(MCQS, 2, reply)
+
+
+
+def test_use_client_supplies_the_config(fake_client):
+    assert agent.get_client() is fake_client
+    assert agent.text_config() is None
+
+    config = object()
+    agent.use_client(fake_client, config)
+    assert agent.text_config() is config
+
+
+def test_fake_client_path_never_imports_the_gemini_sdk():
+    # Fresh interpreter, with streamlit (which loads google.protobuf) imported first as in the app
+    snippet = ("import sys, streamlit, agent\n"
+               "agent.generate_mcq_questions('slides', 2)\n"
+               "agent.grade_submission({'mcqs': '', 'longs': '1. Explain X. [Marks: 5]', 'progs': ''},"
+               " {}, {1: 'An answer.'}, {})\n"
+               "print('google.genai' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            env=dict(os.environ, AGENT_MODEL_CLIENT="fake"))
+    assert result.stdout.strip() == "False"
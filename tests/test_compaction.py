@@ -0,0 +1,43 @@
+from compaction import compact_pages, compact_slides
+
+FOOTER = "DSE312 Machine Learning - University of Example"
+
+
+def deck(bodies):
+    return [f"{FOOTER}\nSlide {n} / {len(bodies)}\n{body}\n{n}" for n, body in enumerate(bodies, start=1)]
+
+
+def test_repeated_lines_and_slide_numbers_are_removed():
+    kept, boilerplate = compact_pages(deck([
+        "Gradient descent updates the weights along the negative gradient.",
+        "The learning rate controls the size of each update step taken.",
+        "Momentum accumulates past gradients to smooth the optimisation path.",
+        "Adam combines momentum with per-parameter adaptive learning rates."]))
+    assert [number for number, _ in kept] == [1, 2, 3, 4]
+    assert all(FOOTER not in text and "Slide" not in text for _, text in kept)
+    assert kept[0][1] == "Gradient descent updates the weights along the negative gradient."
+    assert FOOTER.lower() in boilerplate
+
+
+def test_numeric_content_is_kept():
+    kept, _ = compact_pages(["Constants used in this lecture are listed below\n3.14\n-1\n42\n0.5 | 0.25\n7"])
+    assert kept[0][1].split("\n")[1:] == ["3.14", "-1", "42", "0.5 | 0.25"]
+
+
+def test_hyphenation_is_repaired_and_short_pages_dropped():
+    kept, _ = compact_pages(["Thanks!", "Backpropa-\n  gation computes gradients layer by layer efficiently."])
+    assert kept == [(2, "Backpropagation computes gradients layer by layer efficiently.")]
+
+
+def test_tiny_deck_keeps_its_text():
+    kept, _ = compact_pages(["Intro", "", "Summary"])
+    assert kept == [(1, "Intro"), (3, "Summary")]
+
+
+def test_compact_slides_reports_the_saving():
+    text, report = compact_slides(deck(["Content line that is long enough to keep on page %d." % n
+                                        for n in range(1, 6)]))
+    assert text.startswith("[Page 1]\n")
+    assert report["pages"] == report["pages_kept"] == 5
+    assert report["compacted_tokens"] < report["original_tokens"]
+    assert 0 < report["saved_ratio"] < 1
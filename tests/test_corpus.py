@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+import corpus
+from corpus import CourseCorpus, lecture_number, parse_lecture_selection
+
+
+def test_selection_ranges_only_cover_known_lectures():
+    assert parse_lecture_selection("3-7, 9", range(1, 11)) == {3, 4, 5, 6, 7, 9}
+    assert parse_lecture_selection("1-100000000", {1, 2, 12}) == {1, 2, 12}
+    assert parse_lecture_selection("2 - 3 5", {1, 2, 3, 4, 5}) == {2, 3, 5}
+    assert parse_lecture_selection("", {1}) == set()
+
+
+@pytest.mark.parametrize("selection", ["3-", "-3", "7-3", "a", "1-2-3", "3.5"])
+def test_malformed_selection_raises(selection):
+    with pytest.raises(ValueError):
+        parse_lecture_selection(selection, range(1, 10))
+
+
+@pytest.mark.parametrize("name, number", [
+    ("lecture03.pdf", 3),
+    ("DSE312_lecture01.pdf", 1),
+    ("DSE312 Lec 12 - Trees.pdf", 12),
+    ("week2_part4.pdf", 4),
+    ("intro.pdf", None),
+])
+def test_lecture_number(name, number):
+    assert lecture_number(name) == number
+
+
+@pytest.fixture
+def course(tmp_path, monkeypatch):
+    """A course folder whose "PDFs" are text files, one page per line."""
+    extracted = []
+
+    def fake_read_pdf_pages(path, on_error=print):
+        extracted.append(os.path.basename(path))
+        with open(path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    monkeypatch.setattr(corpus, "read_pdf_pages", fake_read_pdf_pages)
+    course_dir = tmp_path / "course"
+    course_dir.mkdir()
+    for name, pages in [("DSE312_lecture01.pdf", "one a\none b"), ("DSE312_lecture02.pdf", "two a"),
+                        ("DSE312_lecture03.pdf", "three a")]:
+        (course_dir / name).write_text(pages, encoding="utf-8")
+    return course_dir, tmp_path / "store", extracted
+
+
+def test_corpus_extracts_each_pdf_once(course):
+    course_dir, store_dir, extracted = course
+    corpus_ = CourseCorpus(str(course_dir), str(store_dir))
+    assert len(corpus_.refresh()["added"]) == 3
+    assert corpus_.lectures() == {1: "DSE312_lecture01.pdf", 2: "DSE312_lecture02.pdf", 3: "DSE312_lecture03.pdf"}
+    assert corpus_.pages("1-2") == ["one a", "one b", "two a"]
+
+    # A fresh corpus over the same store reuses the manifest instead of re-extracting
+    report = CourseCorpus(str(course_dir), str(store_dir)).refresh()
+    assert len(report["unchanged"]) == 3
+    assert len(extracted) == 3
+    assert not os.path.exists(course_dir / ".corpus")
+
+
+def test_corpus_reports_changes_and_conflicts(course):
+    course_dir, store_dir, extracted = course
+    corpus_ = CourseCorpus(str(course_dir), str(store_dir))
+    corpus_.refresh()
+
+    (course_dir / "DSE312_lecture02.pdf").write_text("two revised", encoding="utf-8")
+    (course_dir / "lecture3.pdf").write_text("duplicate", encoding="utf-8")
+    (course_dir / "DSE312_lecture01.pdf").unlink()
+    report = corpus_.refresh()
+    assert report["changed"] == ["DSE312_lecture02.pdf"]
+    assert report["added"] == ["lecture3.pdf"]
+    assert report["removed"] == ["DSE312_lecture01.pdf"]
+    assert corpus_.conflicts == {3: ["lecture3.pdf"]}
+    assert corpus_.pages({2, 3}) == ["two revised", "three a"]
+
+
+def test_corpus_selection_errors(course):
+    course_dir, store_dir, _ = course
+    corpus_ = CourseCorpus(str(course_dir), str(store_dir))
+    corpus_.refresh()
+    with pytest.raises(KeyError):
+        corpus_.pages("4")
+    with pytest.raises(ValueError):
+        corpus_.pages("5-9")
+    with pytest.raises(ValueError):
+        corpus_.pages("3-")
+
+
+def test_unreadable_pdf_is_skipped_until_it_changes(course, monkeypatch):
+    course_dir, store_dir, extracted = course
+    fake_read_pdf_pages = corpus.read_pdf_pages
+
+    def read_or_fail(path, on_error=print):
+        if path.endswith("broken.pdf") and open(path, encoding="utf-8").read() == "not a pdf":
+            extracted.append("broken.pdf")
+            on_error("Error reading PDF: EOF marker not found")
+            return None
+        return fake_read_pdf_pages(path, on_error)
+
+    monkeypatch.setattr(corpus, "read_pdf_pages", read_or_fail)
+    (course_dir / "broken.pdf").write_text("not a pdf", encoding="utf-8")
+    errors = []
+    corpus_ = CourseCorpus(str(course_dir), str(store_dir))
+    assert corpus_.refresh(errors.append)["failed"] == ["broken.pdf"]
+    for _ in range(3):
+        assert corpus_.refresh(errors.append)["failed"] == []
+    assert CourseCorpus(str(course_dir), str(store_dir)).refresh(errors.append)["failed"] == []
+
+    assert extracted.count("broken.pdf") == 1
+    assert errors == ["broken.pdf: Error reading PDF: EOF marker not found"]
+    assert list(corpus_.failures()) == ["broken.pdf"]
+    assert "broken.pdf" not in corpus_.lectures().values()
+
+    (course_dir / "broken.pdf").write_text("fixed page", encoding="utf-8")
+    os.utime(course_dir / "broken.pdf", ns=(1, 1))
+    assert corpus_.refresh(errors.append)["changed"] == ["broken.pdf"]
+    assert corpus_.failures() == {}
+    assert corpus_.pages({4}) == ["fixed page"]
@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+
+from agent import grade_submission
+from export import (
+    grade_rows, latex_escape, render_assignment_tex, render_grade_report_tex, student_summary, write_grades_csv,
+    write_grades_jsonl
+)
+
+ASSIGNMENT = {
+    "mcqs": ("1. What does a gradient point towards? [Marks: 2]\n"
+             "   A) Steepest ascent\n   B) Steepest descent\n   C) The origin\n   D) A minimum\n"
+             "   Correct Answer: A\n\n"
+             "2. Which costs 50% less & why? [Marks: 3]\n"
+             "   A) SGD\n   B) Adam\n   C) Newton\n   D) L-BFGS\n"
+             "   Correct Answer: B"),
+    # No space after the number: grading still finds both questions
+    "longs": "1.Explain backpropagation. [Marks: 5]\n2.Explain the chain rule. [Marks: 5]",
+    "progs": "1. Write a function returning x_1 + x_2. [Marks: 10]",
+}
+COURSE = {"course_code": "DSE_312", "assignment_number": 1, "date": "May 1, 2025"}
+
+
+def record(**overrides):
+    return {
+        "student_id": "s_001",
+        "evaluation_results": {
+            "mcq1": {"user_answer": "A", "correct_answer": "A", "correct": True},
+            "mcq2": {"user_answer": "C", "correct_answer": "B", "correct": False},
+            "long1": {"question": "1.Explain backpropagation. [Marks: 5]", "user_answer": "Chain rule.",
+                      "feedback": "Mention the gradients.", "suggested_marks": 3},
+            "prog1": {"question": "1. Write a function returning x_1 + x_2. [Marks: 10]",
+                      "user_code": "def f(x_1, x_2): return x_1 + x_2", "feedback": "Works.",
+                      "suggested_marks": 8},
+        },
+        "overrides": overrides,
+    }
+
+
+def test_rows_follow_grading_numbering_and_final_marks():
+    rows = {row["question"]: row for row in grade_rows(ASSIGNMENT, record(prog1=10))}
+    assert list(rows) == ["mcq1", "mcq2", "long1", "long2", "prog1"]
+    assert (rows["mcq1"]["final_marks"], rows["mcq2"]["final_marks"]) == (2, 0)
+    assert rows["long1"]["attempted"] and rows["long1"]["final_marks"] == 3
+    assert not rows["long1"]["overridden"]
+    assert not rows["long2"]["attempted"] and rows["long2"]["max_marks"] == 5
+    assert rows["prog1"]["final_marks"] == 10 and rows["prog1"]["overridden"]
+    assert rows["prog1"]["suggested_marks"] == 8
+
+
+def test_graded_long_answers_are_exported(fake_client):
+    results = grade_submission(ASSIGNMENT, {1: "A"}, {1: "Chain rule.", 2: "Derivatives compose."}, {})
+    exported = {row["question"] for row in grade_rows(ASSIGNMENT, {"student_id": "s", "evaluation_results": results})
+                if row["attempted"]}
+    assert exported == set(results) == {"mcq1", "long1", "long2"}
+
+
+def test_results_the_paper_no_longer_lists_still_get_a_row():
+    student = record()
+    student["evaluation_results"]["long3"] = {"question": "3. Explain dropout. [Marks: 4]", "user_answer": "x",
+                                              "feedback": "", "suggested_marks": 1}
+    rows = [row for row in grade_rows(ASSIGNMENT, student) if row["question"] == "long3"]
+    assert len(rows) == 1
+    assert rows[0]["section"] == "longs" and rows[0]["max_marks"] == 4 and rows[0]["final_marks"] == 1
+
+
+def test_summary_totals_attempted_questions_only():
+    summary = student_summary(ASSIGNMENT, record(long1=5))
+    assert summary["marks_obtained"] == 2 + 0 + 5 + 8
+    assert summary["total_marks"] == 2 + 3 + 5 + 10
+    assert summary["paper_marks"] == 2 + 3 + 5 + 5 + 10
+    assert (summary["attempted"], summary["question_count"]) == (4, 5)
+    assert summary["percentage"] == 75.0
+
+
+def test_writers_emit_one_row_per_question_and_one_line_per_student():
+    f = io.StringIO()
+    assert write_grades_csv(ASSIGNMENT, [record(), record()], f) == 2
+    assert len(list(csv.DictReader(io.StringIO(f.getvalue())))) == 10
+
+    f = io.StringIO()
+    assert write_grades_jsonl(ASSIGNMENT, [record()], f) == 1
+    assert json.loads(f.getvalue())["marks_obtained"] == 13
+
+
+def test_latex_escape():
+    assert latex_escape(r"50% & $x_1$ {a} #1 ~ ^ \ ") == \
+        r"50\% \& \$x\_1\$ \{a\} \#1 \textasciitilde{} \textasciicircum{} \textbackslash{} "
+
+
+def test_assignment_tex_escapes_text_and_adds_answers_only_to_the_key():
+    paper = render_assignment_tex(ASSIGNMENT, COURSE)
+    key = render_assignment_tex(ASSIGNMENT, COURSE, answer_key=True)
+    assert "DSE\\_312" in paper
+    assert "Which costs 50\\% less \\& why? [Marks: 3]" in paper
+    assert "x\\_1 + x\\_2" in paper
+    assert "\\item B) Adam" in paper
+    assert "Correct Answer" not in paper and "Answer:" not in paper
+    assert "\\textbf{Answer: A}" in key and "\\textbf{Answer: B}" in key
+    assert key.count("Marked against the rubric") == 3
+    assert "Explain the chain rule." in key
+
+
+def test_grade_report_tex():
+    tex = render_grade_report_tex(ASSIGNMENT, record(prog1=10), COURSE)
+    assert "\\textbf{Student:} s\\_001" in tex
+    assert "15/20 (75.0\\%)" in tex
+    assert "4/5 questions" in tex
+    assert "long2 & Not attempted & 0/5" in tex
+    assert "prog1 & AI suggested 8 (instructor override) & 10/10" in tex
+    assert "mcq2 & Answered C, correct answer B & 0/3" in tex
+    assert "Mention the gradients." in tex
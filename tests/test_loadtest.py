@@ -0,0 +1,38 @@
+from loadtest import find_saturation, percentile, summarize_level
+
+
+def session(app_seconds, roundtrip, error=None, rss=1024):
+    reruns = [("load", app_seconds, roundtrip), ("generate", 1.0, 1.2), ("override", app_seconds, roundtrip)]
+    return {"timings": {"load": app_seconds, "generate": 1.0}, "reruns": reruns, "error": error,
+            "rss_growth_bytes": rss}
+
+
+def level(concurrency, p95, sessions_per_second, error_rate=0.0):
+    return {"concurrency": concurrency, "rerun": {"p95": p95}, "sessions_per_second": sessions_per_second,
+            "error_rate": error_rate}
+
+
+def test_percentile():
+    assert percentile([], 0.95) == 0.0
+    assert percentile([3, 1, 2], 0.5) == 2
+    assert percentile(range(101), 0.95) == 95
+
+
+def test_summary_uses_app_time_and_reports_harness_overhead():
+    summary = summarize_level(2, [session(0.05, 0.25), session(0.07, 0.27, error="generate: boom", rss=3072)],
+                              wall=4.0)
+    assert summary["sessions_per_second"] == 0.5
+    assert summary["rerun"]["count"] == 4                 # the model-bound generate rerun is excluded
+    assert summary["rerun"]["p95"] == 0.07
+    assert round(summary["rerun"]["harness_overhead_p50"], 3) == 0.2
+    assert summary["session_rss_growth_bytes"] == {"p50": 1024, "max": 3072}
+    assert summary["error_rate"] == 0.5
+    assert summary["errors"] == ["generate: boom"]
+
+
+def test_saturation_reasons():
+    assert find_saturation([level(1, 0.05, 1.0), level(2, 0.06, 1.9)], 0.1, 0.01) == (None, "not reached")
+    assert find_saturation([level(1, 0.05, 1.0), level(2, 0.2, 1.9)], 0.1, 0.01)[0] == 2
+    assert find_saturation([level(1, 0.05, 1.0, error_rate=0.05)], 0.1, 0.01)[1].startswith("error rate")
+    assert find_saturation([level(1, 0.05, 1.0), level(2, 0.06, 1.05)], 0.1, 0.01) == \
+        (2, "throughput stopped scaling")
@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+
+from profiler import RerunProfiler, StackSampler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = RerunProfiler()
+    profiler.start_rerun()
+    with profiler.section("tab"):
+        pass
+    profiler.finish_rerun()
+    assert list(profiler.history) == []
+    assert profiler.averages() == {}
+
+
+def test_sections_accumulate_within_a_rerun():
+    profiler = RerunProfiler(enabled=True)
+    profiler.start_rerun()
+    with profiler.section("Parse questions"):
+        busy(0.01)
+    with profiler.section("Parse questions"):
+        busy(0.01)
+    with profiler.section("Evaluation tab"):
+        pass
+    profiler.finish_rerun()
+
+    rerun = profiler.history[-1]
+    assert set(rerun["sections"]) == {"Parse questions", "Evaluation tab"}
+    assert rerun["sections"]["Parse questions"] >= 0.02
+    assert rerun["total"] >= rerun["sections"]["Parse questions"]
+
+
+def test_section_outside_a_rerun_is_a_no_op():
+    profiler = RerunProfiler(enabled=True)
+    with profiler.section("tab"):
+        pass
+    assert list(profiler.history) == []
+
+
+def test_averages_over_rolling_history():
+    profiler = RerunProfiler(enabled=True, history=2)
+    for sections in ({"a": 1.0}, {"a": 3.0, "b": 2.0}, {"a": 5.0}):
+        profiler.history.append({"started": 0, "total": sum(sections.values()), "sections": sections})
+    assert len(profiler.history) == 2
+    assert profiler.averages() == {"total": 5.0, "a": 4.0, "b": 2.0}
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "sampling"])
+def test_capture_covers_exactly_the_next_rerun(mode):
+    profiler = RerunProfiler(enabled=True)
+    profiler.capture_next = mode
+    profiler.start_rerun()
+    assert profiler.capture_next is None
+    busy(0.02)
+    profiler.finish_rerun()
+
+    assert profiler.last_capture["mode"] == mode
+    assert "busy" in profiler.last_capture["summary"]
+    captured = profiler.last_capture
+    profiler.start_rerun()
+    profiler.finish_rerun()
+    assert profiler.last_capture is captured       # later reruns are not captured
+
+
+def test_interrupted_rerun_stops_its_collector():
+    profiler = RerunProfiler(enabled=True)
+    profiler.capture_next = "sampling"
+    profiler.start_rerun()
+    sampler = profiler._collector
+    profiler.start_rerun()                          # a newer rerun replaced this one before it finished
+    assert isinstance(sampler, StackSampler) and not sampler._thread.is_alive()
+    profiler.finish_rerun()
+    assert profiler.last_capture is None
+    assert len(profiler.history) == 1
+
+
+def test_write_saves_history_and_capture(tmp_path):
+    profiler = RerunProfiler(enabled=True)
+    profiler.capture_next = "cprofile"
+    profiler.start_rerun()
+    profiler.finish_rerun()
+    paths = profiler.write(str(tmp_path))
+    assert [os.path.splitext(path)[1] for path in paths] == [".json", ".prof"]
+    assert all(os.path.getsize(path) for path in paths)
@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pytest
+
+from service import GradingService, HttpServer
+
+SLIDES = {"slides_text": "Gradient descent updates weights along the negative gradient.", "mcq": 2,
+          "long": 1, "prog": 1}
+
+
+async def request(port, method, target, body=None, headers=None):
+    """Send one HTTP request to the local server; returns (status, headers, JSON body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    raw = json.dumps(body).encode() if body is not None else b""
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost", f"Content-Length: {len(raw)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + raw)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {name.lower(): value.strip() for name, _, value in
+                        (line.partition(":") for line in header_lines)}
+    return int(status_line.split(" ")[1]), response_headers, json.loads(payload)
+
+
+def run_with_server(scenario, read_timeout=30, **service_options):
+    async def main():
+        service = GradingService(**service_options)
+        server = await asyncio.start_server(HttpServer(service, read_timeout=read_timeout).handle_connection,
+                                            "127.0.0.1", 0)
+        async with server:
+            return await scenario(server.sockets[0].getsockname()[1], service)
+    return asyncio.run(main())
+
+
+def test_generate_returns_202_then_polls_to_done(fake_client):
+    fake_client.latency = 0.2
+
+    async def scenario(port, service):
+        status, headers, body = await request(port, "POST", "/generate", SLIDES)
+        assert status == 202
+        assert body["status"] in ("queued", "running")
+        assert headers["location"] == f"/jobs/{body['id']}"
+
+        status, _, body = await request(port, "GET", headers["location"] + "?wait=5")
+        assert status == 200
+        assert body["status"] == "done"
+        assert set(body["result"]) == {"mcqs", "longs", "progs"}
+        assert "Correct Answer" in body["result"]["mcqs"]
+
+    run_with_server(scenario)
+
+
+def test_wait_returns_result_inline(fake_client):
+    async def scenario(port, service):
+        status, _, body = await request(port, "POST", "/generate?wait=5", SLIDES)
+        assert status == 200
+        assert body["status"] == "done"
+
+    run_with_server(scenario)
+
+
+def test_idempotency_key_replays_the_same_job(fake_client):
+    async def scenario(port, service):
+        key = {"Idempotency-Key": "submission-1"}
+        _, _, first = await request(port, "POST", "/generate?wait=5", SLIDES, key)
+        calls = fake_client.calls
+        status, _, replay = await request(port, "POST", "/generate?wait=5", SLIDES, key)
+        assert status == 200
+        assert replay["id"] == first["id"]
+        assert replay["result"] == first["result"]
+        assert fake_client.calls == calls
+        assert len(service.jobs) == 1
+
+    run_with_server(scenario)
+
+
+def test_idempotency_key_with_different_payload_is_409(fake_client):
+    async def scenario(port, service):
+        key = {"Idempotency-Key": "submission-1"}
+        await request(port, "POST", "/generate?wait=5", SLIDES, key)
+        status, _, body = await request(port, "POST", "/generate", dict(SLIDES, mcq=3), key)
+        assert status == 409
+        assert "different payload" in body["error"]
+        assert len(service.jobs) == 1
+
+    run_with_server(scenario)
+
+
+def test_failed_job_releases_its_idempotency_key(fake_client):
+    fake_client.error_rate = 1.0
+
+    async def scenario(port, service):
+        key = {"Idempotency-Key": "submission-1"}
+        _, _, failed = await request(port, "POST", "/generate?wait=5", SLIDES, key)
+        assert failed["status"] == "failed"
+
+        fake_client.error_rate = 0.0
+        _, _, retried = await request(port, "POST", "/generate?wait=5", SLIDES, key)
+        assert retried["id"] != failed["id"]
+        assert retried["status"] == "done"
+
+    run_with_server(scenario)
+
+
+def test_bad_requests_are_400_and_queue_nothing(fake_client):
+    async def scenario(port, service):
+        status, _, _ = await request(port, "POST", "/generate?wait=x", SLIDES)
+        assert status == 400
+        status, _, _ = await request(port, "POST", "/generate", [1, 2])
+        assert status == 400
+        status, _, _ = await request(port, "POST", "/grade", {"answers": {}})
+        assert status == 400
+        assert service.jobs == {}
+
+    run_with_server(scenario)
+
+
+@pytest.mark.parametrize("kind, body", [
+    ("generate", dict(SLIDES, mcq="three")),
+    ("generate", dict(SLIDES, mcq=100000)),
+    ("generate", dict(SLIDES, long=0)),
+    ("generate", dict(SLIDES, prog=2.5)),
+    ("generate", {"mcq": 2}),
+    ("generate", {"pdf_base64": "not base64!"}),
+    ("grade", {"assignment": {"mcqs": "1. Q? [Marks: 2]"}}),
+    ("grade", {"assignment": {"mcqs": "", "longs": "", "progs": ""}, "answers": {"long": {"1": 5}}}),
+    ("grade", {"assignment": {"mcqs": "", "longs": "", "progs": ""}, "answers": {"mcq": {"first": "A"}}}),
+])
+def test_invalid_payloads_are_rejected_before_queueing(fake_client, kind, body):
+    async def scenario(port, service):
+        status, _, response = await request(port, "POST", f"/{kind}", body)
+        assert status == 400, response
+        assert service.jobs == {}
+        assert fake_client.calls == 0
+
+    run_with_server(scenario)
+
+
+def test_slow_client_gets_408():
+    async def scenario(port, service):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /generate HTTP/1.1\r\nContent-Length: 100\r\n\r\n{")
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        assert response.startswith(b"HTTP/1.1 408")
+
+    run_with_server(scenario, read_timeout=0.2)
+
+
+def test_grade_scores_attempted_questions(fake_client):
+    assignment = {"mcqs": "1. Q? [Marks: 2]\n   A) a\n   B) b\n   C) c\n   D) d\n   Correct Answer: B",
+                  "longs": "1. Explain gradient descent. [Marks: 8]",
+                  "progs": "1. Write a program to add two numbers. [Marks: 10]"}
+
+    async def scenario(port, service):
+        status, _, body = await request(port, "POST", "/grade?wait=5", {
+            "assignment": assignment, "answers": {"mcq": {"1": "B"}, "long": {"1": "It follows the gradient."}}})
+        assert status == 200
+        result = body["result"]
+        assert set(result) == {"mcq1", "long1"}
+        assert result["mcq1"]["correct"] is True
+        assert 0 <= result["long1"]["suggested_marks"] <= 8
+
+    run_with_server(scenario)
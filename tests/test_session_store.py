@@ -0,0 +1,81 @@
+import os
+import time
+
+import pytest
+
+from session_store import BlobHandle, SessionStateManager
+
+
+@pytest.fixture
+def store():
+    manager = SessionStateManager(memory_cap_bytes=1024, idle_seconds=600, expire_seconds=3600)
+    yield manager
+    manager.close()
+
+
+def test_identical_text_is_stored_once(store):
+    a = store.put("s1", "shared assignment text")
+    b = store.put("s2", "shared assignment text")
+    assert a == b
+    assert store.stats()["blobs"] == 1
+    assert store.footprint("s1")["shared_bytes"] == a.size
+
+
+def test_fields_round_trip(store):
+    record = {"user_answer": "An answer.", "feedback": "Good.", "suggested_marks": 4}
+    stored = store.put_fields("s1", record, ("user_answer", "feedback"))
+    assert isinstance(stored["feedback"], BlobHandle)
+    assert stored["suggested_marks"] == 4
+    assert store.resolve(stored) == record
+
+
+def test_memory_cap_spills_least_recently_used(store):
+    old = store.put("s1", "a" * 600)
+    new = store.put("s1", "b" * 600)
+    assert store.stats()["memory_bytes"] <= 1024
+    assert os.path.exists(store._path(old.digest))
+    assert store.get(old) == "a" * 600      # reloaded from disk transparently
+    assert store.get(new) == "b" * 600
+
+
+def test_release_fields_frees_replaced_handles(store):
+    first = store.put_fields("s1", {"mcqs": "old questions"}, ("mcqs",))
+    shared = store.put("s2", "old questions")
+    store.put_fields("s1", {"mcqs": "new questions"}, ("mcqs",))
+    store.release_fields("s1", first)
+    assert store.footprint("s1")["blobs"] == 1
+    assert store.get(shared) == "old questions"     # still referenced by s2
+
+    store.release_fields("s2", {"text": shared})
+    with pytest.raises(KeyError):
+        store.get(shared)
+
+
+def test_a_handle_stored_twice_needs_two_releases(store):
+    first = store.put("s1", "same text")
+    second = store.put("s1", "same text")
+    store.release_fields("s1", {"text": first})
+    assert store.get(second) == "same text"
+    store.release_fields("s1", {"text": second})
+    assert store.stats()["blobs"] == 0
+
+
+def test_idle_sessions_spill_and_expired_sessions_are_released(store):
+    handle = store.put("s1", "idle text")
+    store._sessions["s1"]["last_seen"] = time.time() - 700
+    store.evict_idle()
+    assert store.footprint("s1")["disk_bytes"] == handle.size
+    assert store.is_live("s1")
+
+    store._sessions["s1"]["last_seen"] = time.time() - 4000
+    store.evict_idle()
+    assert not store.is_live("s1")
+    assert store.stats() == {"sessions": 0, "blobs": 0, "memory_bytes": 0, "disk_bytes": 0}
+    assert os.listdir(store.spill_dir) == []
+
+
+def test_close_removes_its_own_spill_dir():
+    manager = SessionStateManager()
+    manager.put("s1", "text")
+    manager.close()
+    assert not os.path.exists(manager.spill_dir)